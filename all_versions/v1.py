@@ -1,15 +1,36 @@
 import os
+import queue
+import logging
+import logging.handlers
+import multiprocessing
+import multiprocessing.util
 import json
+import orjson
 import re
 import time
-import random
 import asyncio
-from typing import List, Dict, Optional, Any
+from contextlib import ExitStack, contextmanager, asynccontextmanager
+from functools import lru_cache
+from typing import List, Dict, Optional, Any, Iterable, Iterator, AsyncIterator, Tuple
 from datetime import datetime
 from urllib.parse import urlparse, urljoin
 
+logger = logging.getLogger(__name__)
+
+def _configure_queue_logging(log_queue) -> None:
+    # Runs in the API process and in every scrape worker: records become non-blocking enqueues,
+    # and the single QueueListener in the API process is the only writer to stderr.
+    logger.handlers[:] = [logging.handlers.QueueHandler(log_queue)]
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+def _init_scrape_worker(log_queue) -> None:
+    _configure_queue_logging(log_queue)
+    # Pool workers leave through os._exit, so atexit never fires there; multiprocessing's own finalizers do.
+    multiprocessing.util.Finalize(None, _quit_pooled_drivers, exitpriority=10)
+
 # --- Pydantic Models ---
-from pydantic import BaseModel, Field, HttpUrl, ValidationError
+from pydantic import BaseModel, Field, HttpUrl, TypeAdapter
 
 class Review(BaseModel):
     text: str
@@ -26,104 +47,225 @@ class Question(BaseModel):
 class ScrapeRequest(BaseModel):
     urls: List[HttpUrl]
 
+_QUESTION_LIST_ADAPTER = TypeAdapter(List[Question])
+
 # --- FastAPI ---
-from fastapi import FastAPI, HTTPException, Body
+from concurrent.futures import ProcessPoolExecutor
+from fastapi import FastAPI, HTTPException, Body, Request
+from fastapi.responses import ORJSONResponse, StreamingResponse
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Each scrape gets its own OS process (own GIL, own ChromeDriver); the pool size caps concurrent Chromes per CPU.
+    available_cpus = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else (os.cpu_count() or 1)
+    log_queue = multiprocessing.Queue(-1)
+    log_handler = logging.StreamHandler()
+    log_handler.setFormatter(logging.Formatter("%(asctime)s %(processName)s %(levelname)s %(message)s"))
+    log_listener = logging.handlers.QueueListener(log_queue, log_handler)
+    _configure_queue_logging(log_queue)
+    log_listener.start()
+    app.state.scrape_executor = ProcessPoolExecutor(
+        max_workers=min(available_cpus, 8), initializer=_init_scrape_worker, initargs=(log_queue,)
+    )
+    try:
+        yield
+    finally:
+        app.state.scrape_executor.shutdown(wait=False, cancel_futures=True)
+        log_listener.stop()
+
 app = FastAPI(
     title="Comparably Scraper API",
     description="API to scrape company reviews (multi-category, multi-page) from Comparably using Selenium.",
-    version="1.3.0" # Version bump
+    version="1.3.0", # Version bump
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
-# --- Selenium and BeautifulSoup ---
-from bs4 import BeautifulSoup
+# --- Selenium and lxml ---
+from lxml import etree
+from lxml import html as lxml_html
 from selenium import webdriver
-from selenium.common.exceptions import TimeoutException, NoSuchElementException, ElementClickInterceptedException
+from selenium.common.exceptions import WebDriverException
 from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from webdriver_manager.chrome import ChromeDriverManager
+from curl_cffi.requests import AsyncSession as CurlCffiAsyncSession, RequestsError
 
 # --- User Agent ---
 try:
     from fake_useragent import UserAgent
     ua = UserAgent()
 except ImportError:
-    print("Warning: fake-useragent not installed. Using a generic User-Agent.")
+    logger.warning("fake-useragent not installed. Using a generic User-Agent.")
     ua = None
 
+# --- Review Dedup Hash ---
+try:
+    import xxhash
+    def _text_hash(text: str) -> int:
+        # Stable across processes, unlike the per-process salted hash()
+        return xxhash.xxh3_64_intdigest(text.encode('utf-8'))
+except ImportError:
+    logger.warning("xxhash not installed. Falling back to Python's built-in hash for review dedup.")
+    _text_hash = hash
+
 # --- Constants ---
 REVIEW_CATEGORIES = ["leadership", "compensation", "team", "environment", "outlook"]
+_REVIEW_CATEGORIES_SET = frozenset(REVIEW_CATEGORIES) # Membership checks; the list keeps scrape order
 MAX_PAGES_PER_CATEGORY = 15 # Safety limit for pagination
+CURL_IMPERSONATE_BROWSER = "chrome"
+CURL_REQUEST_TIMEOUT_S = 20
+_CHALLENGE_MARKER = b"challenge-platform"
+_NOT_FOUND_STATUS_CODES = frozenset({404, 410}) # Missing category or past the last page; a browser won't find it either
+TAB_CONTENT_TIMEOUT_S = 18 # How long a category tab may take to show reviews after a navigation
+TAB_POLL_INTERVAL_S = 0.25 # Pause when no tab was ready on a round-robin pass
 
 # --- Helper: Extract Section Name ---
+_SECTION_RE = re.compile(r'/reviews/(\w+)')
+
+@lru_cache(maxsize=256) # The same section links repeat on every page of a category
 def extract_section_name_from_url(href: Optional[str]) -> str:
     if not href: return "unknown_section"
     try:
         path_parts = urlparse(href).path.strip('/').split('/')
         if len(path_parts) >= 4 and path_parts[2] == 'reviews': return path_parts[3]
     except Exception: pass
-    match = re.search(r'/reviews/(\w+)', href)
+    match = _SECTION_RE.search(href)
     return match.group(1) if match else "unknown_section"
 
 # --- Integrated Parsing Logic ---
-def parse_review_page_html(soup: BeautifulSoup, company_slug: str) -> List[Question]:
+def _class_xpath(tag: str, class_name: str) -> str:
+    return f".//{tag}[contains(concat(' ', normalize-space(@class), ' '), ' {class_name} ')]"
+
+# Compiled once; evaluated in libxml2 so no per-node Python wrappers are built.
+_XP_REVIEW_LISTS = etree.XPath(_class_xpath('div', 'reviewsList'))
+_XP_QUESTION = etree.XPath(_class_xpath('h2', 'section-subtitle'))
+_XP_SECTION_LINK = etree.XPath(_class_xpath('p', 'section-text') + "//a/@href")
+_XP_REVIEW_BLOCKS = etree.XPath(_class_xpath('div', 'cppRH'))
+_XP_QUOTE = etree.XPath(_class_xpath('p', 'cppRH-review-quote'))
+_XP_DATE = etree.XPath(_class_xpath('cite', 'cppRH-review-cite') + "//meta[@itemprop='datePublished']/@content")
+_XP_CITE_META_CONTENT = etree.XPath(_class_xpath('cite', 'cppRH-review-cite') + "//meta/@content")
+_XP_TEXT = etree.XPath(".//text()")
+_XP_NAME_TAGS = etree.XPath("(//h1)[1] | (//title)[1]")
+_ISO_DATE_RE = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+
+def _text(elem) -> str:
+    # Equivalent of BeautifulSoup's get_text(strip=True)
+    return "".join(t.strip() for t in _XP_TEXT(elem))
+
+def _build_question(question_text: str, section_href: Optional[str], raw_reviews: Iterable[Tuple[Optional[str], Optional[str]]]) -> Optional[Question]:
+    # Shared by the HTML and in-browser extraction paths; raw_reviews are (text, YYYY-MM-DD) pairs.
+    # The section_name here is tied to the link in the HTML, might not always match the overall category being processed
+    section_name_from_page = extract_section_name_from_url(section_href) if section_href else "unknown_section"
+
+    reviews_for_this_question: List[Review] = []
+    for text, date_str in raw_reviews:
+        if text is None: continue
+        if not date_str:
+            continue
+        try:
+            # Fixed YYYY-MM-DD layout, so slice it rather than run strptime's format machinery per review
+            if len(date_str) != 10 or date_str[4] != '-' or date_str[7] != '-': raise ValueError(date_str)
+            date_val = datetime(int(date_str[0:4]), int(date_str[5:7]), int(date_str[8:10]))
+        except ValueError:
+            continue
+        # Text and date were just normalised above, so skip pydantic validation for these models
+        reviews_for_this_question.append(Review.model_construct(text=text.replace('\u0000', ''), date=date_val))
+
+    if not reviews_for_this_question: return None
+
+    reviews_for_this_question.sort(key=lambda r: r.date, reverse=True)
+    section = ReviewSection.model_construct(section_name=section_name_from_page, reviews=reviews_for_this_question)
+    return Question.model_construct(question_text=question_text, review_section=section)
+
+def _parse_review_list(review_list_div) -> Optional[Question]:
+    q_elems = _XP_QUESTION(review_list_div)
+    if not q_elems: return None
+    section_hrefs = _XP_SECTION_LINK(review_list_div)
+
+    raw_reviews = []
+    for block in _XP_REVIEW_BLOCKS(review_list_div): # Individual review containers
+        quotes = _XP_QUOTE(block)
+        if not quotes: continue
+        date_strs = _XP_DATE(block) or [c for c in _XP_CITE_META_CONTENT(block) if _ISO_DATE_RE.match(c)]
+        raw_reviews.append((_text(quotes[0]), date_strs[0] if date_strs else None))
+
+    return _build_question(_text(q_elems[0]), section_hrefs[0] if section_hrefs else None, raw_reviews)
+
+def parse_review_page_html(page_root: lxml_html.HtmlElement, company_slug: str) -> List[Question]:
     questions: List[Question] = []
-    review_list_divs = soup.find_all('div', class_='reviewsList')
+    review_list_divs = _XP_REVIEW_LISTS(page_root)
     if not review_list_divs:
-        # print(f"Debug: No 'div.reviewsList' found in HTML for {company_slug} on current page.")
         return []
 
     for review_list_div in review_list_divs:
-        q_elem = review_list_div.find('h2', class_='section-subtitle')
-        if not q_elem: continue
-        question_text = q_elem.get_text(strip=True)
-
-        section_name_from_page = "unknown_section" # Default if link not found
-        link_p = review_list_div.find('p', class_='section-text')
-        if link_p and (a_tag := link_p.find('a', href=True)):
-            section_name_from_page = extract_section_name_from_url(a_tag['href'])
-        # If parsing HTML directly, the section name should reflect the current category context
-        # This might be redundant if we pass category_name, but good for independent parsing
-
-        reviews_for_this_question: List[Review] = []
-        review_blocks = review_list_div.find_all('div', class_='cppRH') # Individual review containers
-
-        for block in review_blocks:
-            quote = block.find('p', class_='cppRH-review-quote')
-            if not quote: continue
-            text = quote.get_text(strip=True).replace('\u0000', '')
-
-            cite_block = block.find('cite', class_='cppRH-review-cite')
-            date_meta = None
-            if cite_block:
-                date_meta = cite_block.find('meta', {'itemprop': 'datePublished'}) or \
-                            cite_block.find('meta', attrs={'content': re.compile(r'^\d{4}-\d{2}-\d{2}$')})
-
-            if not date_meta or not date_meta.get('content'):
-                # print(f"Debug: No date found for review: {text[:30]}...")
-                continue
-            try:
-                date_val = datetime.strptime(date_meta['content'], '%Y-%m-%d')
-            except ValueError:
-                # print(f"Debug: Invalid date format: {date_meta['content']}")
-                continue
-            reviews_for_this_question.append(Review(text=text, date=date_val))
+        question = _parse_review_list(review_list_div)
+        if question: questions.append(question)
+    return questions
 
-        if not reviews_for_this_question: continue
+async def parse_review_page_stream(chunks: AsyncIterator[bytes]) -> Tuple[List[Question], Optional[etree._Element], bool]:
+    # Builds each question as its div.reviewsList closes, then empties that subtree, so parsing overlaps the download
+    # and the finished tree only keeps what extract_company_info reads. The bool reports a challenge page.
+    parser = etree.HTMLPullParser(events=("end",), tag="div")
+    questions: List[Question] = []
+    previous_tail = b""
+    async for chunk in chunks:
+        recent_bytes = previous_tail + chunk # The marker may straddle chunk boundaries
+        if _CHALLENGE_MARKER in recent_bytes:
+            return [], None, True
+        previous_tail = recent_bytes[-len(_CHALLENGE_MARKER):]
+        parser.feed(chunk)
+        for _, elem in parser.read_events():
+            if 'reviewsList' in (elem.get('class') or '').split():
+                question = _parse_review_list(elem)
+                if question: questions.append(question)
+                elem.clear(keep_tail=True)
+    return questions, parser.close(), False
+
+# Runs in the page and returns only the review strings, so neither the ~1MB page_source nor an
+# HTML parse is needed per page. Text is joined like _text() so both paths yield identical reviews.
+_EXTRACT_REVIEW_LISTS_JS = r"""
+const txt = el => {
+    if (!el) return null;
+    const walker = document.createTreeWalker(el, NodeFilter.SHOW_TEXT);
+    let out = '', node;
+    while ((node = walker.nextNode())) out += node.nodeValue.trim();
+    return out;
+};
+const hasClass = c => `[class~="${c}"]`;
+return Array.from(document.querySelectorAll('div' + hasClass('reviewsList'))).map(rl => {
+    const link = rl.querySelector('p' + hasClass('section-text') + ' a[href]');
+    return {
+        q: txt(rl.querySelector('h2' + hasClass('section-subtitle'))),
+        href: link ? link.getAttribute('href') : null,
+        reviews: Array.from(rl.querySelectorAll('div' + hasClass('cppRH'))).map(b => {
+            const cite = b.querySelector('cite' + hasClass('cppRH-review-cite'));
+            const meta = cite && (cite.querySelector('meta[itemprop="datePublished"]') ||
+                Array.from(cite.querySelectorAll('meta[content]')).find(m => /^\d{4}-\d{2}-\d{2}$/.test(m.content)));
+            return [txt(b.querySelector('p' + hasClass('cppRH-review-quote'))), meta ? meta.getAttribute('content') : null];
+        })
+    };
+});
+"""
 
-        reviews_for_this_question.sort(key=lambda r: r.date, reverse=True)
-        try:
-            # The section_name here is tied to the link in the HTML, might not always match the overall category being processed
-            # If we rely on overall category context, use that instead. For now, this uses what's parsed.
-            section = ReviewSection(section_name=section_name_from_page, reviews=reviews_for_this_question)
-            questions.append(Question(question_text=question_text, review_section=section))
-        except ValidationError as e:
-            print(f"Pydantic validation error creating Question for '{question_text}': {e}")
+def parse_review_page_data(page_data: List[Dict[str, Any]], company_slug: str) -> List[Question]:
+    # Counterpart of parse_review_page_html for the _EXTRACT_REVIEW_LISTS_JS result
+    questions: List[Question] = []
+    for review_list in page_data:
+        if not review_list.get('q'): continue
+        question = _build_question(review_list['q'], review_list.get('href'), review_list.get('reviews') or [])
+        if question: questions.append(question)
     return questions
 
+def read_review_lists_html(driver: webdriver.Chrome) -> lxml_html.HtmlElement:
+    # Ships only the div.reviewsList subtrees over CDP instead of the whole serialized DOM.
+    # Wrapped in one parent so parse_review_page_html finds them as it would in the full page.
+    root_node_id = driver.execute_cdp_cmd('DOM.getDocument', {'depth': 0, 'pierce': False})['root']['nodeId']
+    node_ids = driver.execute_cdp_cmd('DOM.querySelectorAll', {'nodeId': root_node_id, 'selector': 'div.reviewsList'})['nodeIds']
+    fragments = [driver.execute_cdp_cmd('DOM.getOuterHTML', {'nodeId': node_id})['outerHTML'] for node_id in node_ids]
+    return lxml_html.fragment_fromstring("".join(fragments), create_parent='div')
+
 # --- Function to Extract Basic Company Info ---
-def extract_company_info(soup: BeautifulSoup, company_base_url_str: str) -> Dict:
+def extract_company_info(page_root: lxml_html.HtmlElement, company_base_url_str: str) -> Dict:
     details = {}
     try:
         parsed_base_url = urlparse(str(company_base_url_str))
@@ -134,31 +276,32 @@ def extract_company_info(soup: BeautifulSoup, company_base_url_str: str) -> Dict
         details['company_name'] = default_name
         details['comparably_url'] = str(company_base_url_str) # Original base URL
 
+        # First <h1> and <title> in one XPath evaluation; the union comes back in document order
+        name_tags = {tag.tag: tag for tag in _XP_NAME_TAGS(page_root)}
+
         # Attempt to get name from H1 on the current page (could be a category reviews page)
         # The H1 might be like "Datadog Leadership Reviews"
-        name_tag_h1 = soup.find('h1') # More generic H1
-        if name_tag_h1:
-            h1_text = name_tag_h1.get_text(strip=True)
+        if 'h1' in name_tags:
+            h1_text = _text(name_tags['h1'])
             # Try to extract a cleaner company name if H1 includes " Reviews" or category
             # This is heuristic
             if " Reviews" in h1_text:
                 name_candidate = h1_text.split(" Reviews")[0].strip()
                 # Avoid setting if it becomes just the category name
-                if name_candidate.lower() not in REVIEW_CATEGORIES and len(name_candidate) > 3:
+                if name_candidate.lower() not in _REVIEW_CATEGORIES_SET and len(name_candidate) > 3:
                     details['company_name'] = name_candidate
 
         # Fallback to page title if H1 wasn't specific enough
-        if details['company_name'] == default_name or details['company_name'].lower() in REVIEW_CATEGORIES :
-            title_tag = soup.find('title')
-            if title_tag:
-                title_text = title_tag.get_text(strip=True)
+        if details['company_name'] == default_name or details['company_name'].lower() in _REVIEW_CATEGORIES_SET:
+            if 'title' in name_tags:
+                title_text = _text(name_tags['title'])
                 # Example: "Datadog Leadership Reviews | Comparably"
                 name_from_title = title_text.split(" Reviews")[0].split(" | Comparably")[0].strip()
                 if name_from_title and name_from_title != details['company_name'] and len(name_from_title) > 3:
                     details['company_name'] = name_from_title
 
     except Exception as e:
-        print(f"Error extracting company details (URL: {company_base_url_str}): {e}")
+        logger.error(f"Error extracting company details (URL: {company_base_url_str}): {e}")
     return details
 
 # --- Selenium Setup ---
@@ -174,6 +317,16 @@ def setup_driver():
 
     options.add_experimental_option("excludeSwitches", ["enable-automation"])
     options.add_experimental_option('useAutomationExtension', False)
+    # Only the DOM is read, so skip images, stylesheets, fonts and media; 'eager' returns at DOMContentLoaded.
+    options.add_argument("--blink-settings=imagesEnabled=false")
+    options.add_experimental_option("prefs", {
+        "profile.managed_default_content_settings.images": 2,
+        "profile.managed_default_content_settings.stylesheets": 2,
+        "profile.managed_default_content_settings.fonts": 2,
+        "profile.managed_default_content_settings.plugins": 2,
+        "profile.managed_default_content_settings.media_stream": 2,
+    })
+    options.page_load_strategy = 'eager'
     try:
         service = Service(ChromeDriverManager().install())
         driver = webdriver.Chrome(service=service, options=options)
@@ -187,156 +340,267 @@ def setup_driver():
         })
         return driver
     except Exception as e:
-        print(f"Error setting up WebDriver: {e}")
+        logger.error(f"Error setting up WebDriver: {e}")
         raise RuntimeError(f"Failed to setup Selenium WebDriver: {e}")
 
 
+# --- Driver Pool ---
+# Per process: with the ProcessPoolExecutor each worker runs one scrape at a time, so one warm Chrome suffices.
+DRIVER_POOL_SIZE = 1
+COMPARABLY_ORIGIN = "https://www.comparably.com"
+_DRIVER_POOL: "queue.Queue[webdriver.Chrome]" = queue.Queue(maxsize=DRIVER_POOL_SIZE)
+
+@contextmanager
+def get_driver() -> Iterator[webdriver.Chrome]:
+    try:
+        driver = _DRIVER_POOL.get_nowait()
+    except queue.Empty:
+        driver = setup_driver()
+    try:
+        yield driver
+    finally:
+        release_driver(driver)
+
+def release_driver(driver: webdriver.Chrome) -> None:
+    # Back to a single blank tab with no Comparably state, or quit if it can't be cleaned.
+    try:
+        handles = driver.window_handles
+        for extra_handle in handles[1:]:
+            driver.switch_to.window(extra_handle)
+            driver.close()
+        driver.switch_to.window(handles[0])
+        driver.get("about:blank")
+        driver.execute_cdp_cmd('Network.clearBrowserCookies', {})
+        driver.execute_cdp_cmd('Storage.clearDataForOrigin', {'origin': COMPARABLY_ORIGIN, 'storageTypes': 'all'})
+        _DRIVER_POOL.put_nowait(driver)
+    except (WebDriverException, queue.Full) as e_release:
+        if isinstance(e_release, WebDriverException):
+            logger.warning(f"Pooled driver unusable after scrape ({type(e_release).__name__}); discarding it.")
+        try: driver.quit()
+        except Exception: pass
+
+def _quit_pooled_drivers() -> None:
+    while True:
+        try:
+            driver = _DRIVER_POOL.get_nowait()
+        except queue.Empty:
+            break
+        try: driver.quit()
+        except Exception as e_quit: logger.error(f"Error quitting pooled driver: {e_quit}")
+
+
+# --- Per-Page Helpers ---
+def _merge_page_questions(
+    questions_on_this_page: List[Question],
+    category_name: str,
+    all_questions_for_company: List[Question],
+    questions_by_text: Dict[str, Question],
+    processed_reviews_tracker: set
+) -> int:
+    reviews_added_this_page_count = 0
+    for q_parsed_from_page in questions_on_this_page:
+        # Override section_name with the current category context for consistency
+        q_parsed_from_page.review_section.section_name = category_name
+        q_hash = _text_hash(q_parsed_from_page.question_text) # Same text as existing_q_object's, so one hash serves both branches
+
+        existing_q_object = questions_by_text.get(q_parsed_from_page.question_text)
+
+        if not existing_q_object: # New question structure for this company
+            unique_reviews_for_new_q = []
+            for review in q_parsed_from_page.review_section.reviews:
+                review_key = (q_hash, _text_hash(review.text), review.date.toordinal())
+                if review_key not in processed_reviews_tracker:
+                    unique_reviews_for_new_q.append(review)
+                    processed_reviews_tracker.add(review_key)
+                    reviews_added_this_page_count += 1
+            if unique_reviews_for_new_q:
+                q_parsed_from_page.review_section.reviews = unique_reviews_for_new_q # Replace with only unique
+                all_questions_for_company.append(q_parsed_from_page)
+                questions_by_text[q_parsed_from_page.question_text] = q_parsed_from_page
+        else: # Question structure already exists, append new unique reviews
+            for review in q_parsed_from_page.review_section.reviews:
+                review_key = (q_hash, _text_hash(review.text), review.date.toordinal())
+                if review_key not in processed_reviews_tracker:
+                    existing_q_object.review_section.reviews.append(review)
+                    processed_reviews_tracker.add(review_key)
+                    reviews_added_this_page_count += 1
+            existing_q_object.review_section.reviews.sort(key=lambda r: r.date, reverse=True)
+    return reviews_added_this_page_count
+
+# Navigating by URL from script returns immediately, unlike driver.get, so other tabs keep being serviced.
+# The flag lives on the old document only, so a tab counts as ready once the new page has replaced it.
+_NAVIGATE_TAB_JS = "window.__v1PageScraped = true; window.location.href = arguments[0];"
+_TAB_READY_JS = "return !window.__v1PageScraped && document.querySelector('div.cppRH') !== null;"
+
+
+# --- curl_cffi Fetching ---
+async def _scrape_category_curl(
+    curl_session: CurlCffiAsyncSession,
+    company_base_url_str: str,
+    category_name: str,
+    company_slug: str,
+    all_questions_for_company: List[Question],
+    questions_by_text: Dict[str, Question],
+    processed_reviews_tracker: set,
+    company_details_overall: Dict[str, Any]
+) -> bool:
+    # Walks ?page=N over HTTP; returns False if Comparably served a challenge and the category needs Chrome.
+    category_url_base = f"{company_base_url_str.rstrip('/')}/reviews/{category_name}/"
+    for page_count_in_category in range(1, MAX_PAGES_PER_CATEGORY + 1):
+        page_url = category_url_base if page_count_in_category == 1 else f"{category_url_base}?page={page_count_in_category}"
+        logger.info(f"    curl_cffi fetching page {page_count_in_category} for '{category_name}' (URL: {page_url})")
+        try:
+            response = await curl_session.get(page_url, stream=True)
+            try:
+                not_found = response.status_code in _NOT_FOUND_STATUS_CODES
+                challenged = not not_found and response.status_code != 200
+                if not not_found and not challenged:
+                    questions_on_this_page, page_root, challenged = await parse_review_page_stream(response.aiter_content())
+            finally:
+                await response.aclose()
+        except RequestsError as e_req:
+            logger.error(f"    curl_cffi error for '{category_name}' page {page_count_in_category}: {e_req}")
+            return page_count_in_category > 1 # Later pages keep what was gathered; a failed first page goes to Chrome
+        if not_found:
+            logger.info(f"    HTTP {response.status_code} on page {page_count_in_category} of '{category_name}'. End of category.")
+            return True
+        if challenged:
+            if page_count_in_category == 1:
+                logger.warning(f"    Category '{category_name}' is behind a challenge (HTTP {response.status_code}); leaving it to Selenium.")
+                return False
+            logger.info(f"    HTTP {response.status_code} on page {page_count_in_category} of '{category_name}'. End of category.")
+            return True
+
+        if not company_details_overall and page_root is not None: # Fetch once
+            company_details_overall.update(extract_company_info(page_root, company_base_url_str))
+
+        if not questions_on_this_page:
+            logger.info(f"    No review questions parsed from page {page_count_in_category} of '{category_name}'.")
+            return True
+        reviews_added_this_page_count = _merge_page_questions(
+            questions_on_this_page, category_name, all_questions_for_company, questions_by_text, processed_reviews_tracker
+        )
+        if reviews_added_this_page_count == 0:
+            # Past the last page Comparably repeats earlier reviews instead of returning an empty list
+            logger.info(f"    Page {page_count_in_category} of '{category_name}' had no new reviews. End of category.")
+            return True
+        logger.info(f"    Added {reviews_added_this_page_count} unique reviews from page {page_count_in_category} of '{category_name}'.")
+    return True
+
+async def _scrape_categories_curl(
+    company_base_url_str: str,
+    company_slug: str,
+    all_questions_for_company: List[Question],
+    questions_by_text: Dict[str, Question],
+    processed_reviews_tracker: set,
+    company_details_overall: Dict[str, Any]
+) -> List[str]:
+    # All categories share one session, so their requests are multiplexed over one HTTP/2 connection.
+    # Merging happens on this one event loop, so the shared dedup state needs no locking.
+    async with CurlCffiAsyncSession(impersonate=CURL_IMPERSONATE_BROWSER, timeout=CURL_REQUEST_TIMEOUT_S) as curl_session:
+        served_over_http = await asyncio.gather(*(
+            _scrape_category_curl(
+                curl_session, company_base_url_str, category_name, company_slug,
+                all_questions_for_company, questions_by_text, processed_reviews_tracker, company_details_overall
+            )
+            for category_name in REVIEW_CATEGORIES
+        ))
+    return [category_name for category_name, served in zip(REVIEW_CATEGORIES, served_over_http) if not served]
+
+
 # --- Main Scraping Function ---
 def scrape_comparably_sync(company_base_url_str: str, company_slug: str) -> Dict[str, Any]:
-    print(f"Starting multi-category, multi-page scrape for: {company_slug}")
+    logger.info(f"Starting multi-category, multi-page scrape for: {company_slug}")
     driver = None
+    driver_lease = ExitStack() # Returns the pooled driver, if one was taken, when the scrape ends
     start_time_total = time.time()
 
     all_questions_for_company: List[Question] = []
+    questions_by_text: Dict[str, Question] = {} # Index over all_questions_for_company
     company_details_overall: Dict[str, Any] = {}
-    processed_reviews_tracker = set() # (question_text_hash, review_text_hash, review_date)
+    processed_reviews_tracker = set() # (question_text_hash, review_text_hash, review_date_ordinal)
 
     try:
-        driver = setup_driver()
-        wait = WebDriverWait(driver, 18) # General wait for elements
-        short_wait = WebDriverWait(driver, 7) # For quick checks like button presence
-
-        for category_idx, category_name in enumerate(REVIEW_CATEGORIES):
-            # Construct base URL for the category, ensuring trailing slash for urljoin to work as expected if used
-            # For direct navigation, we build the full URL.
+        # Review pages are server-rendered, so plain HTTP covers them; Chrome is started only for challenged categories.
+        browser_categories = asyncio.run(_scrape_categories_curl(
+            company_base_url_str, company_slug,
+            all_questions_for_company, questions_by_text, processed_reviews_tracker, company_details_overall
+        ))
+        if browser_categories:
+            logger.warning(f"  Falling back to Selenium for: {', '.join(browser_categories)}")
+            driver = driver_lease.enter_context(get_driver())
+
+        # One tab per category: the browser loads all of them at once while this thread
+        # services whichever tab has content ready, instead of waiting on each in turn.
+        tabs: Dict[str, Dict[str, Any]] = {}
+        for category_idx, category_name in enumerate(browser_categories):
             category_url_base = f"{company_base_url_str.rstrip('/')}/reviews/{category_name}/"
-            print(f"\n  Processing category: {category_name} ({category_idx+1}/{len(REVIEW_CATEGORIES)})")
-            print(f"    Navigating to initial category page: {category_url_base}")
-            driver.get(category_url_base)
-
-            time.sleep(0.75)
-            if "Error" in driver.title or "Not Found" in driver.title or "404" in driver.title:
-                print(f"    Error page detected for category '{category_name}'. Skipping category.")
-                continue
-
-            page_count_in_category = 0
-            while page_count_in_category < MAX_PAGES_PER_CATEGORY:
-                page_count_in_category += 1
-                current_page_scrape_url = driver.current_url # Log the URL we are actually scraping
-                print(f"    Scraping page {page_count_in_category} for '{category_name}' (URL: {current_page_scrape_url})")
-
-                review_block_selector = "div.cppRH"
-                try:
-                    wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, review_block_selector)))
-                except TimeoutException:
-                    print(f"    Timeout waiting for review content on page {page_count_in_category} of '{category_name}'.")
-                    if page_count_in_category == 1:
-                        print(f"    Category '{category_name}' appears to be empty or no reviews on its first page.")
-                    break # Break from pagination loop for this category
-
-                current_soup = BeautifulSoup(driver.page_source, 'html.parser')
-
-                if not company_details_overall: # Fetch once
-                    company_details_overall = extract_company_info(current_soup, company_base_url_str)
-
-                questions_on_this_page = parse_review_page_html(current_soup, company_slug)
-                reviews_added_this_page_count = 0
-
-                if questions_on_this_page:
-                    for q_parsed_from_page in questions_on_this_page:
-                        # Override section_name with the current category context for consistency
-                        q_parsed_from_page.review_section.section_name = category_name
-
-                        existing_q_object = next((q for q in all_questions_for_company if q.question_text == q_parsed_from_page.question_text), None)
-
-                        if not existing_q_object: # New question structure for this company
-                            unique_reviews_for_new_q = []
-                            for review in q_parsed_from_page.review_section.reviews:
-                                review_key = (hash(q_parsed_from_page.question_text), hash(review.text), review.date)
-                                if review_key not in processed_reviews_tracker:
-                                    unique_reviews_for_new_q.append(review)
-                                    processed_reviews_tracker.add(review_key)
-                                    reviews_added_this_page_count += 1
-                            if unique_reviews_for_new_q:
-                                q_parsed_from_page.review_section.reviews = unique_reviews_for_new_q # Replace with only unique
-                                all_questions_for_company.append(q_parsed_from_page)
-                        else: # Question structure already exists, append new unique reviews
-                            for review in q_parsed_from_page.review_section.reviews:
-                                review_key = (hash(existing_q_object.question_text), hash(review.text), review.date)
-                                if review_key not in processed_reviews_tracker:
-                                    existing_q_object.review_section.reviews.append(review)
-                                    processed_reviews_tracker.add(review_key)
-                                    reviews_added_this_page_count += 1
-                            existing_q_object.review_section.reviews.sort(key=lambda r: r.date, reverse=True)
-
-                    if reviews_added_this_page_count > 0:
-                        print(f"    Added {reviews_added_this_page_count} unique reviews from page {page_count_in_category} of '{category_name}'.")
-                else:
-                    print(f"    No review questions parsed from page {page_count_in_category} of '{category_name}'.")
+            known_handles = set(driver.window_handles)
+            driver.execute_script("window.open(arguments[0], '_blank');", category_url_base)
+            tab_handle = next(h for h in driver.window_handles if h not in known_handles)
+            logger.info(f"  Opened tab for category: {category_name} ({category_idx+1}/{len(browser_categories)}) -> {category_url_base}")
+            tabs[tab_handle] = {"category": category_name, "url_base": category_url_base, "page_count": 1, "deadline": time.time() + TAB_CONTENT_TIMEOUT_S}
+
+        while tabs:
+            serviced_a_tab = False
+            for tab_handle in list(tabs):
+                tab = tabs[tab_handle]
+                driver.switch_to.window(tab_handle)
+                category_name = tab["category"]
+                page_count_in_category = tab["page_count"]
+
+                if page_count_in_category == 1 and ("Error" in driver.title or "Not Found" in driver.title or "404" in driver.title):
+                    logger.warning(f"    Error page detected for category '{category_name}'. Skipping category.")
+                    del tabs[tab_handle]; continue
+
+                if not driver.execute_script(_TAB_READY_JS):
+                    if time.time() < tab["deadline"]: continue # Still loading; look at the other tabs meanwhile
+                    logger.warning(f"    Timeout waiting for review content on page {page_count_in_category} of '{category_name}'.")
                     if page_count_in_category == 1:
-                        print(f"    Category '{category_name}' seems empty (first page).")
-                    break # End pagination for this category
+                        logger.info(f"    Category '{category_name}' appears to be empty or no reviews on its first page.")
+                    del tabs[tab_handle]; continue
 
-                # --- Click-Based Pagination Logic ---
-                next_page_button_element = None
-                try:
-                    # Selector for the '>' button, often an <a> tag inside <li> or with specific class/aria-label
-                    # Example: <li class="pagination-next"><a href="...?page=2">Next</a></li>
-                    # Or the direct button like in your image.
-                    # The tooltip "Next Page" is a strong hint.
-                    # This specific selector targets an <a> tag whose direct child is a <span> with class "ico-arrow-right"
-                    # or an <a> tag with aria-label="Next Page". Adapt if needed.
-                    selectors_for_next = [
-                        "a.pagination-link[rel='next']", # Common standard
-                        "a[aria-label='Next Page']",
-                        "a[title='Next Page']",
-                        "li.pagination-next > a", # Next button within an li
-                        "a.pagination-next", # A common class name for next button
-                        "nav[aria-label*='pagination'] li:last-child a[href]" # Last link in pagination nav
-                    ]
-                    for sel in selectors_for_next:
-                        try:
-                            # Check if element is present and then if it's clickable
-                            candidate_buttons = driver.find_elements(By.CSS_SELECTOR, sel)
-                            for btn in candidate_buttons:
-                                # Filter out "Previous" if selector is too general and ensure it's displayed
-                                if btn.is_displayed() and ("prev" not in (btn.get_attribute("aria-label") or "").lower() and \
-                                   "prev" not in (btn.get_attribute("rel") or "").lower()):
-                                    next_page_button_element = short_wait.until(EC.element_to_be_clickable(btn))
-                                    if next_page_button_element:
-                                        print(f"    Found 'Next Page' button with selector: '{sel}' and text/aria: '{next_page_button_element.text or next_page_button_element.get_attribute('aria-label')}'")
-                                        break # Found a suitable button
-                            if next_page_button_element: break # Found it, exit selector loop
-                        except (NoSuchElementException, TimeoutException):
-                            continue # Try next selector
-
-                    if not next_page_button_element:
-                        print(f"    No clickable 'Next Page' button found for '{category_name}' after page {page_count_in_category}. End of category.")
-                        break
-
-                    print(f"    Attempting to click 'Next Page' button (Current URL: {driver.current_url})...")
-                    # Scroll into view gently
-                    driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", next_page_button_element)
-                    time.sleep(0.5) # Brief pause for scrolling
+                serviced_a_tab = True
+                logger.info(f"    Scraping page {page_count_in_category} for '{category_name}' (URL: {driver.current_url})")
+                if not company_details_overall: # Fetch once; the only full page_source read per company
+                    company_details_overall.update(extract_company_info(lxml_html.fromstring(driver.page_source), company_base_url_str))
 
+                try:
+                    questions_on_this_page = parse_review_page_data(driver.execute_script(_EXTRACT_REVIEW_LISTS_JS), company_slug)
+                except WebDriverException as e_extract:
+                    logger.warning(f"    In-page review extraction failed ({type(e_extract).__name__}); falling back to HTML parsing.")
                     try:
-                        next_page_button_element.click()
-                    except ElementClickInterceptedException:
-                        print("    Click intercepted, trying JavaScript click for 'Next Page'...")
-                        driver.execute_script("arguments[0].click();", next_page_button_element)
-
-                    # Wait for page to transition. A robust way is to wait for old content to go stale
-                    # or new content to load fully. For simplicity, a timed wait.
-                    time.sleep(random.uniform(2.0, 4.0)) # Increased wait for content to load
-
-                except (NoSuchElementException, TimeoutException) as e_pagination:
-                    print(f"    No 'Next Page' button or error in pagination logic for '{category_name}' after page {page_count_in_category}. (Error: {type(e_pagination).__name__}). End of category.")
-                    break
-            # Small delay between categories
-            time.sleep(random.uniform(1.5, 3.0))
+                        review_lists_root = read_review_lists_html(driver)
+                    except (WebDriverException, KeyError) as e_cdp:
+                        logger.warning(f"    CDP review-list read failed ({type(e_cdp).__name__}); using page_source.")
+                        review_lists_root = lxml_html.fromstring(driver.page_source)
+                    questions_on_this_page = parse_review_page_html(review_lists_root, company_slug)
+                if not questions_on_this_page:
+                    logger.info(f"    No review questions parsed from page {page_count_in_category} of '{category_name}'.")
+                    if page_count_in_category == 1:
+                        logger.info(f"    Category '{category_name}' seems empty (first page).")
+                    del tabs[tab_handle]; continue # End pagination for this category
+
+                reviews_added_this_page_count = _merge_page_questions(
+                    questions_on_this_page, category_name, all_questions_for_company, questions_by_text, processed_reviews_tracker
+                )
+                if reviews_added_this_page_count == 0:
+                    # Past the last page Comparably repeats earlier reviews instead of returning an empty list
+                    logger.info(f"    Page {page_count_in_category} of '{category_name}' had no new reviews. End of category.")
+                    del tabs[tab_handle]; continue
+                logger.info(f"    Added {reviews_added_this_page_count} unique reviews from page {page_count_in_category} of '{category_name}'.")
+                if page_count_in_category >= MAX_PAGES_PER_CATEGORY:
+                    del tabs[tab_handle]; continue
+
+                tab["page_count"] += 1
+                driver.execute_script(_NAVIGATE_TAB_JS, f"{tab['url_base']}?page={tab['page_count']}")
+                tab["deadline"] = time.time() + TAB_CONTENT_TIMEOUT_S
+
+            if tabs and not serviced_a_tab:
+                time.sleep(TAB_POLL_INTERVAL_S)
 
         total_duration = time.time() - start_time_total
-        print(f"\nFinished all categories for {company_slug} in {total_duration:.2f}s. Total unique questions structured: {len(all_questions_for_company)}")
+        logger.info(f"Finished all categories for {company_slug} in {total_duration:.2f}s. Total unique questions structured: {len(all_questions_for_company)}")
 
         if not company_details_overall and all_questions_for_company: # Failsafe
              company_details_overall = {"company_name": company_slug.replace('-', ' ').title(), "comparably_url": company_base_url_str, "status_note": "Company details fetch might have been incomplete"}
@@ -345,33 +609,34 @@ def scrape_comparably_sync(company_base_url_str: str, company_slug: str) -> Dict
             "status": "success",
             "data": {
                 "company_info": company_details_overall,
-                "reviews": [q.model_dump(mode='json') for q in all_questions_for_company]
+                "reviews": _QUESTION_LIST_ADAPTER.dump_python(all_questions_for_company) # One call; orjson serialises the datetimes
             }
         }
 
     except Exception as e:
         total_duration = time.time() - start_time_total
-        print(f"Critical error during multi-category scrape for {company_slug} after {total_duration:.2f}s: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception(f"Critical error during multi-category scrape for {company_slug} after {total_duration:.2f}s: {e}")
         return {"status": "error", "message": f"An internal error occurred: {str(e)}"}
     finally:
-        if driver:
-            driver.quit()
+        driver_lease.close()
 
 # --- FastAPI Endpoint ---
-@app.post("/scrape")
-async def scrape_companies(
-    request: ScrapeRequest = Body(...)
-) -> Dict[str, Dict[str, Any]]:
-    urls = request.urls
-    if not urls:
-        raise HTTPException(status_code=400, detail="No URLs provided.")
+async def _scrape_as_completed(scrape_executor: ProcessPoolExecutor, urls: List[HttpUrl]) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+    # Yields (url, result) as each company finishes, so one slow URL no longer holds back the others
+    loop = asyncio.get_running_loop()
 
-    results: Dict[str, Dict[str, Any]] = {}
-    tasks = []
-    print(f"Received request to scrape {len(urls)} URLs (multi-category, click pagination v1.3).")
+    async def _scrape_one(url_str: str, company_slug: str) -> Tuple[str, Dict[str, Any]]:
+        try:
+            result = await loop.run_in_executor(scrape_executor, scrape_comparably_sync, url_str, company_slug)
+        except Exception as e_task:
+            logger.error(f"Task for {url_str} raised an exception: {e_task}")
+            return url_str, {"status": "error", "message": f"Scraping task failed: {e_task}"}
+        if not isinstance(result, dict):
+            logger.warning(f"Unexpected result type for {url_str}: {type(result)}")
+            return url_str, {"status": "error", "message": "Unexpected internal result type from scraper"}
+        return url_str, result
 
+    tasks = []
     for url_obj in urls:
         url_str = str(url_obj)
         try:
@@ -383,29 +648,48 @@ async def scrape_companies(
             else:
                 raise ValueError("URL path does not conform to /companies/company-slug structure")
         except Exception as e_slug:
-            print(f"Error parsing company slug from URL '{url_str}': {e_slug}")
-            results[url_str] = {"status": "error", "message": f"Invalid Comparably company URL format: {url_str}"}
+            logger.error(f"Error parsing company slug from URL '{url_str}': {e_slug}")
+            yield url_str, {"status": "error", "message": f"Invalid Comparably company URL format: {url_str}"}
             continue
+        tasks.append(_scrape_one(url_str, company_slug))
 
-        tasks.append(
-            asyncio.to_thread(scrape_comparably_sync, url_str, company_slug)
-        )
+    for next_done in asyncio.as_completed(tasks):
+        yield await next_done
 
-    scraped_results = await asyncio.gather(*tasks, return_exceptions=True)
+@app.post("/scrape")
+async def scrape_companies(
+    http_request: Request,
+    request: ScrapeRequest = Body(...)
+) -> Dict[str, Dict[str, Any]]:
+    urls = request.urls
+    if not urls:
+        raise HTTPException(status_code=400, detail="No URLs provided.")
 
-    for i, url_obj in enumerate(urls):
-        url_str = str(url_obj)
-        if url_str in results: continue # Skip URLs that failed slug parsing
-
-        result_or_exc = scraped_results[i]
-        if isinstance(result_or_exc, Exception):
-            print(f"Task for {url_str} raised an exception: {result_or_exc}")
-            results[url_str] = {"status": "error", "message": f"Scraping task failed: {result_or_exc}"}
-        elif isinstance(result_or_exc, dict):
-             results[url_str] = result_or_exc
-        else:
-             print(f"Unexpected result type for {url_str}: {type(result_or_exc)}")
-             results[url_str] = {"status": "error", "message": "Unexpected internal result type from scraper"}
-
-    print("Finished processing multi-category scrape request (click pagination v1.3).")
-    return results
+    logger.info(f"Received request to scrape {len(urls)} URLs (multi-category, click pagination v1.3).")
+    results: Dict[str, Dict[str, Any]] = {}
+    async for url_str, url_result in _scrape_as_completed(http_request.app.state.scrape_executor, urls):
+        results[url_str] = url_result
+
+    logger.info("Finished processing multi-category scrape request (click pagination v1.3).")
+    # Returned directly so FastAPI skips jsonable_encoder; orjson handles the review datetimes itself
+    return ORJSONResponse(results)
+
+@app.post("/scrape/stream")
+async def scrape_companies_stream(
+    http_request: Request,
+    request: ScrapeRequest = Body(...)
+) -> StreamingResponse:
+    # Same work as /scrape, but one NDJSON line per URL as it finishes: {"url": ..., "result": ...}
+    urls = request.urls
+    if not urls:
+        raise HTTPException(status_code=400, detail="No URLs provided.")
+
+    logger.info(f"Received streamed request to scrape {len(urls)} URLs.")
+    scrape_executor = http_request.app.state.scrape_executor
+
+    async def _ndjson_lines() -> AsyncIterator[bytes]:
+        async for url_str, url_result in _scrape_as_completed(scrape_executor, urls):
+            yield orjson.dumps({"url": url_str, "result": url_result}) + b"\n"
+        logger.info("Finished streamed multi-category scrape request.")
+
+    return StreamingResponse(_ndjson_lines(), media_type="application/x-ndjson")
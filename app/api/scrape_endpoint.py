@@ -1,33 +1,63 @@
 # scrapper/app/api/scrape_endpoint.py
 
 import asyncio
-import traceback
-from typing import Dict, Any, Optional, List
+import functools
+import re
+from collections import defaultdict
+import logging
+from typing import Dict, Any, Optional, List, Tuple, AsyncIterator, NamedTuple
 from datetime import datetime
-from urllib.parse import urlparse
 
-from fastapi import APIRouter, HTTPException, Body
+import orjson
+from fastapi import APIRouter, HTTPException, Body, Request
+from fastapi.responses import StreamingResponse
 
 from app.schema.scrape_schema import ScrapeRequest
-from app.service.comparably_scraper_service import scrape_comparably_sync
-from app.core.config import API_VERSION # To log correct version
+from app.service.comparably_scraper_service import scrape_comparably_sync, get_cached_scrape_result
+from app.core.responses import OrjsonResponse
+from app.core.config import API_VERSION, COMPARABLY_COMPANY_URL_PATTERN, COMPARABLY_EARLIEST_REVIEW_DATE
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
-@router.post("/scrape", tags=["Scraping"])
-async def scrape_companies_endpoint(request: ScrapeRequest = Body(...)) -> Dict[str, Dict[str, Any]]:
+_COMPARABLY_COMPANY_URL_RE = re.compile(COMPARABLY_COMPANY_URL_PATTERN)
+
+class ScrapeParam(NamedTuple):
+    original_url: str  # As submitted; the key results are reported under
+    base_url: str
+    slug: str
+
+def _parse_ymd(date_str: str) -> datetime:
+    # Fixed YYYY-MM-DD slicing; raises ValueError like strptime for bad shape, digits or calendar values
+    if not (len(date_str) == 10 and date_str[4] == '-' and date_str[7] == '-'
+            and date_str[0:4].isdigit() and date_str[5:7].isdigit() and date_str[8:10].isdigit()):
+        raise ValueError(f"Expected YYYY-MM-DD, got {date_str!r}")
+    return datetime(int(date_str[0:4]), int(date_str[5:7]), int(date_str[8:10]))
+
+def _parse_scrape_url(url_str: str) -> Tuple[Optional[ScrapeParam], Optional[Dict[str, Any]]]:
+    # Returns (scrape params, None) for a company URL, else (None, per-URL error result)
+    slug_match = _COMPARABLY_COMPANY_URL_RE.match(url_str)
+    if slug_match:
+        scheme, netloc, company_slug = slug_match.groups()
+        return ScrapeParam(url_str, f"{scheme}://{netloc}/companies/{company_slug}", company_slug), None
+    # ScrapeRequest already enforces the same pattern, so this is only a guard for direct callers
+    logger.info("Error parsing slug/URL '%s'", url_str)
+    return None, {"status": "error", "message": f"Invalid Comparably company URL format: {url_str}."}
+
+def _prepare_scrape(request: ScrapeRequest) -> Tuple[Optional[datetime], Optional[datetime], List[ScrapeParam], Dict[str, Dict[str, Any]]]:
+    # Validation shared by both routes; raises HTTPException before any scraping (or streaming) starts
     urls = request.urls
     start_date_filter: Optional[datetime] = None
     end_date_filter: Optional[datetime] = None
 
     if request.start_date_str:
         try:
-            start_date_filter = datetime.strptime(request.start_date_str, "%Y-%m-%d")
+            start_date_filter = _parse_ymd(request.start_date_str)
         except ValueError:
             raise HTTPException(status_code=400, detail="Invalid start_date_str. Use YYYY-MM-DD.")
     if request.end_date_str:
         try:
-            end_date_filter = datetime.strptime(request.end_date_str, "%Y-%m-%d")
+            end_date_filter = _parse_ymd(request.end_date_str)
             end_date_filter = end_date_filter.replace(hour=23, minute=59, second=59)
         except ValueError:
             raise HTTPException(status_code=400, detail="Invalid end_date_str. Use YYYY-MM-DD.")
@@ -35,64 +65,161 @@ async def scrape_companies_endpoint(request: ScrapeRequest = Body(...)) -> Dict[
     if start_date_filter and end_date_filter and start_date_filter > end_date_filter:
         raise HTTPException(status_code=400, detail="start_date_str cannot be after end_date_str.")
 
-    if not urls:
-        raise HTTPException(status_code=400, detail="No URLs provided.")
+    precomputed_results: Dict[str, Dict[str, Any]] = {}  # Per-URL answers that need no scrape
+    valid_scrape_params: List[ScrapeParam] = []
 
-    results: Dict[str, Dict[str, Any]] = {}
-    valid_scrape_params: List[Dict[str, str]] = []
+    logger.info("API request: %d URLs, Selenium CatNav & Curl Q-ReviewNav (v%s).", len(urls), API_VERSION) # Using API_VERSION from config
 
-    print(f"API request: {len(urls)} URLs, Selenium CatNav & Curl Q-ReviewNav (v{API_VERSION}).") # Using API_VERSION from config
+    for url_str in urls:
+        scrape_params, url_error = _parse_scrape_url(url_str)
+        if url_error is None:
+            valid_scrape_params.append(scrape_params)
+        else:
+            precomputed_results[url_str] = url_error
 
-    for url_obj in urls:
-        url_str = str(url_obj)
-        try:
-            parsed_url = urlparse(url_str)
-            path_segments = [seg for seg in parsed_url.path.strip('/').split('/') if seg]
-            if not (parsed_url.scheme and parsed_url.netloc and len(path_segments) >= 2 and path_segments[0] == "companies"):
-                raise ValueError("URL format error or incomplete URL")
-            company_slug = path_segments[1]
-            company_base_url = f"{parsed_url.scheme}://{parsed_url.netloc}/companies/{company_slug}"
-            valid_scrape_params.append({'original_url': url_str, 'base_url': company_base_url, 'slug': company_slug})
-        except Exception as e_slug:
-            print(f"Error parsing slug/URL '{url_str}': {e_slug}")
-            results[url_str] = {"status": "error", "message": f"Invalid Comparably company URL format: {url_str}. Error: {e_slug}"}
-
-    tasks = []
-    if valid_scrape_params:
+    # A window entirely in the future or before the site existed can't match any review; answer without scraping
+    if (start_date_filter and start_date_filter > datetime.now()) or (end_date_filter and end_date_filter < COMPARABLY_EARLIEST_REVIEW_DATE):
+        logger.info("Date range %s..%s matches no reviews; skipping %d scrapes.", start_date_filter, end_date_filter, len(valid_scrape_params))
         for params in valid_scrape_params:
-            # scrape_comparably_sync is a synchronous (blocking) function
-            # asyncio.to_thread runs it in a separate thread, making the endpoint non-blocking
-            tasks.append(asyncio.to_thread(
-                scrape_comparably_sync,
-                params['base_url'],
-                params['slug'],
-                start_date_filter,
-                end_date_filter
-            ))
-
-    scraped_results_or_exceptions = await asyncio.gather(*tasks, return_exceptions=True) if tasks else []
-
-    task_idx = 0
+            precomputed_results[params.original_url] = {
+                "status": "success",
+                "message": "Date range excludes all reviews; nothing scraped.",
+                "data": {"company_info": {"comparably_url": params.base_url}, "reviews": []}
+            }
+        valid_scrape_params = []
+
+    return start_date_filter, end_date_filter, valid_scrape_params, precomputed_results
+
+async def _scrape_as_completed(
+    app_state: Any,
+    valid_scrape_params: List[ScrapeParam],
+    start_date_filter: Optional[datetime],
+    end_date_filter: Optional[datetime]
+) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+    # App-wide semaphore (main.lifespan) caps how many companies run, and own browsers, across all requests
+    scrape_semaphore = app_state.scrape_semaphore
+    # Long-lived curl_cffi session created in main.lifespan for company and category pages; Q-review pages use a per-category AsyncSession
+    curl_session = app_state.curl_session
+    driver_pool = app_state.driver_pool
+    scrape_executor = app_state.scrape_executor
+    category_executor = app_state.category_executor
+    loop = asyncio.get_running_loop()
+
+    async def _scrape_one(params: ScrapeParam) -> Tuple[str, Dict[str, Any]]:
+        original_url_str = params.original_url
+        base_url = params.base_url
+        try:
+            async with scrape_semaphore:
+                # scrape_comparably_sync is a synchronous (blocking) function
+                # run_in_executor runs it on the dedicated scrape pool, making the endpoint non-blocking
+                # A pooled browser is leased inside the worker thread, and only if curl_cffi gets challenged
+                result = await loop.run_in_executor(scrape_executor, functools.partial(
+                    scrape_comparably_sync,
+                    params.base_url,
+                    params.slug,
+                    curl_session,
+                    driver_pool,
+                    category_executor,
+                    start_date_filter,
+                    end_date_filter
+                ))
+        except Exception as e_task:
+            logger.error("Task for %s EXCEPTION (type: %s): %s", original_url_str, type(e_task).__name__, e_task)
+            # The traceback is only formatted when DEBUG is enabled
+            logger.debug("FULL TRACEBACK for %s (SelCatCurlQ)", original_url_str, exc_info=e_task)
+            return base_url, {"status": "error", "message": f"Scraping task failed. Type: {type(e_task).__name__}. Check logs."}
+        if not isinstance(result, dict):
+            return base_url, {"status": "error", "message": "Unexpected internal result type from scraping task"}
+        return base_url, result
+
+    # One scrape per company even if several submitted URLs point at it; the result is fanned back out below
+    urls_by_base_url: Dict[str, List[str]] = defaultdict(list)
+    unique_scrape_params: List[ScrapeParam] = []
     for params in valid_scrape_params:
-        original_url_str = params['original_url']
-        if original_url_str in results:  # Already processed due to parsing error
-            continue
-        
-        if task_idx < len(scraped_results_or_exceptions):
-            result_or_exc = scraped_results_or_exceptions[task_idx]
-            if isinstance(result_or_exc, Exception):
-                print(f"Task for {original_url_str} EXCEPTION (type: {type(result_or_exc).__name__}): {result_or_exc}")
-                tb_str = "".join(traceback.format_exception(None, result_or_exc, result_or_exc.__traceback__))
-                print(f"FULL TRACEBACK for {original_url_str} (SelCatCurlQ):\n{tb_str}")
-                results[original_url_str] = {"status": "error", "message": f"Scraping task failed. Type: {type(result_or_exc).__name__}. Check logs."}
-            elif isinstance(result_or_exc, dict):
-                results[original_url_str] = result_or_exc
-            else:
-                results[original_url_str] = {"status": "error", "message": "Unexpected internal result type from scraping task"}
-            task_idx += 1
+        if params.base_url not in urls_by_base_url:
+            unique_scrape_params.append(params)
+        urls_by_base_url[params.base_url].append(params.original_url)
+
+    # Each result is handed over as soon as its company finishes rather than after the slowest one
+    for next_done in asyncio.as_completed([_scrape_one(params) for params in unique_scrape_params]):
+        base_url, url_result = await next_done
+        for original_url_str in urls_by_base_url[base_url]:
+            yield original_url_str, url_result
+
+def _split_cached(
+    valid_scrape_params: List[ScrapeParam],
+    start_date_filter: Optional[datetime],
+    end_date_filter: Optional[datetime]
+) -> Tuple[Dict[str, Dict[str, Any]], List[ScrapeParam], str]:
+    # Cache hits skip the semaphore and executor entirely; the label goes out as the X-Cache header
+    cached_results: Dict[str, Dict[str, Any]] = {}
+    params_to_scrape: List[ScrapeParam] = []
+    for params in valid_scrape_params:
+        cached_result = get_cached_scrape_result(params.base_url, start_date_filter, end_date_filter)
+        if cached_result is not None:
+            cached_results[params.original_url] = cached_result
         else:
-            # This case should ideally not be reached if logic is correct
-            results[original_url_str] = {"status": "error", "message": "Scraping task result missing (logic error)."}
+            params_to_scrape.append(params)
+    if params_to_scrape:
+        cache_label = "PARTIAL" if cached_results else "MISS"
+    else:
+        # SKIP: nothing needed a scrape or a cache lookup (date range short-circuit or only invalid URLs)
+        cache_label = "HIT" if cached_results else "SKIP"
+    return cached_results, params_to_scrape, cache_label
+
+@router.post("/scrape", tags=["Scraping"], response_class=OrjsonResponse)
+async def scrape_companies_endpoint(http_request: Request, request: ScrapeRequest = Body(...)) -> OrjsonResponse:
+    start_date_filter, end_date_filter, valid_scrape_params, results = _prepare_scrape(request)
+    cached_results, params_to_scrape, cache_label = _split_cached(valid_scrape_params, start_date_filter, end_date_filter)
+    results.update(cached_results)
+
+    async for original_url_str, url_result in _scrape_as_completed(http_request.app.state, params_to_scrape, start_date_filter, end_date_filter):
+        results[original_url_str] = url_result
+
+    logger.info("Finished API request processing (SelCatCurlQ v%s).", API_VERSION)
+    # Returned as a Response so FastAPI skips jsonable_encoder; orjson handles the review datetimes itself
+    return OrjsonResponse(results, headers={"X-Cache": cache_label})
+
+async def _iter_all_results(
+    app_state: Any,
+    ready_results: Dict[str, Dict[str, Any]],
+    params_to_scrape: List[ScrapeParam],
+    start_date_filter: Optional[datetime],
+    end_date_filter: Optional[datetime]
+) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+    # Shared by the streaming routes: results that need no scrape first, then each company as it completes
+    for original_url_str, url_result in ready_results.items():
+        yield original_url_str, url_result
+    async for original_url_str, url_result in _scrape_as_completed(app_state, params_to_scrape, start_date_filter, end_date_filter):
+        yield original_url_str, url_result
+
+@router.post("/scrape/stream", tags=["Scraping"])
+async def scrape_companies_stream_endpoint(http_request: Request, request: ScrapeRequest = Body(...)) -> StreamingResponse:
+    # Same work as /scrape, but one NDJSON line per URL as it finishes: {"url": ..., "result": ...}
+    start_date_filter, end_date_filter, valid_scrape_params, precomputed_results = _prepare_scrape(request)
+    cached_results, params_to_scrape, cache_label = _split_cached(valid_scrape_params, start_date_filter, end_date_filter)
+
+    async def _ndjson_lines() -> AsyncIterator[bytes]:
+        async for original_url_str, url_result in _iter_all_results(http_request.app.state, precomputed_results | cached_results, params_to_scrape, start_date_filter, end_date_filter):
+            yield orjson.dumps({"url": original_url_str, "result": url_result}) + b"\n"
+        logger.info("Finished streamed API request processing (SelCatCurlQ v%s).", API_VERSION)
+
+    return StreamingResponse(_ndjson_lines(), media_type="application/x-ndjson", headers={"X-Cache": cache_label})
+
+@router.post("/scrape/batch", tags=["Scraping"])
+async def scrape_companies_batch_endpoint(http_request: Request, request: ScrapeRequest = Body(...)) -> StreamingResponse:
+    # Server-Sent Events for large batches: one "result" event per URL, then a closing "done" event
+    start_date_filter, end_date_filter, valid_scrape_params, precomputed_results = _prepare_scrape(request)
+    cached_results, params_to_scrape, cache_label = _split_cached(valid_scrape_params, start_date_filter, end_date_filter)
+
+    async def _sse_events() -> AsyncIterator[bytes]:
+        async for original_url_str, url_result in _iter_all_results(http_request.app.state, precomputed_results | cached_results, params_to_scrape, start_date_filter, end_date_filter):
+            yield b"event: result\ndata: " + orjson.dumps({"url": original_url_str, "result": url_result}) + b"\n\n"
+        yield b"event: done\ndata: {}\n\n"
+        logger.info("Finished SSE batch API request processing (SelCatCurlQ v%s).", API_VERSION)
 
-    print(f"Finished API request processing (SelCatCurlQ v{API_VERSION}).")
-    return results
\ No newline at end of file
+    return StreamingResponse(
+        _sse_events(),
+        media_type="text/event-stream",
+        headers={"X-Cache": cache_label, "Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -1,14 +1,31 @@
+from datetime import datetime
+
 API_TITLE = "Comparably Scraper API - Selenium CatNav, Curl-CFFI Q-ReviewNav"
 API_DESCRIPTION = "Selenium for Category page navigation, Curl-CFFI for Q-Review pagination."
 API_VERSION = "2.1.0" # Version update for refactor
 
 REVIEW_CATEGORIES = ["leadership", "compensation", "team", "environment", "outlook"]
+REVIEW_CATEGORIES_SET = frozenset(REVIEW_CATEGORIES)  # Membership checks; the list keeps scrape order
+COMPARABLY_EARLIEST_REVIEW_DATE = datetime(2012, 1, 1)  # Site launch; no review can predate it
 MAX_CATEGORY_PAGES = 15
 MAX_REVIEW_PAGES_PER_QUESTION = 20
+Q_REVIEW_MAX_IN_FLIGHT = 8  # Q-review GETs in flight per category, multiplexed over one HTTP/2 connection
+# Near-duplicate review detection (MinHash LSH over word shingles); shorter reviews use exact matching only
+REVIEW_NEAR_DUP_THRESHOLD = 0.85
+REVIEW_MINHASH_NUM_PERM = 64
+REVIEW_SHINGLE_WORDS = 5
+REVIEW_NEAR_DUP_MIN_WORDS = 20
+MAX_CONCURRENT_SCRAPES = 4  # Companies scraped at once across all API requests
+MAX_URLS_PER_REQUEST = 500
+COMPARABLY_COMPANY_URL_PATTERN = r"^(https?)://([^/]+)/companies/([^/?#]+)"  # Groups: scheme, host, company slug
 SELENIUM_PAGE_TIMEOUT_S = 30
 SELENIUM_ELEMENT_TIMEOUT_S = 18  # For waiting for elements on a page
 CURL_REQUEST_TIMEOUT_S = 30
 CURL_IMPERSONATE_BROWSER = "chrome110"
+Q_REVIEW_CACHE_DIR = "/tmp/comparably_cache"
+Q_REVIEW_CACHE_TTL_S = 3600  # Cached Q-review HTML is reused by repeat scrapes within this window
+SCRAPE_RESULT_CACHE_TTL_S = 600  # Whole-company results served from memory for repeat requests
+SCRAPE_RESULT_CACHE_MAXSIZE = 1024
 
 # Order can matter; more specific or reliable ones first
 NEXT_PAGE_SELECTORS = [
@@ -0,0 +1,67 @@
+# scrapper/app/core/driver_pool.py
+
+import logging
+import queue
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from selenium import webdriver
+
+from app.utils.scraper_helpers import setup_selenium_driver
+
+logger = logging.getLogger(__name__)
+
+class DriverPool:
+    """Fixed-size pool of Chrome drivers, started once and leased per company scrape.
+
+    A slot whose browser died holds None and is refilled on its next lease, so a
+    failed relaunch never shrinks the pool.
+    """
+
+    def __init__(self, size: int):
+        self._drivers: "queue.Queue[Optional[webdriver.Chrome]]" = queue.Queue(maxsize=size)
+        for i in range(size):
+            logger.info("Starting Chrome %d/%d...", i + 1, size)
+            try:
+                driver = setup_selenium_driver()
+            except Exception as e_launch:
+                # Most scrapes never need a browser, so a failed launch must not stop the API from starting
+                logger.warning("Chrome %d/%d failed to start (%s); the slot will be filled on its first lease.", i + 1, size, e_launch)
+                driver = None
+            self._drivers.put(driver)
+
+    @contextmanager
+    def lease(self) -> Iterator[webdriver.Chrome]:
+        driver = self._drivers.get()
+        try:
+            if driver is None:
+                driver = setup_selenium_driver()
+            yield driver
+        finally:
+            self._drivers.put(self._reset(driver))
+
+    @staticmethod
+    def _reset(driver: Optional[webdriver.Chrome]) -> Optional[webdriver.Chrome]:
+        # Wipe state left by the previous company; drop the browser if it died mid-scrape.
+        if driver is None:
+            return None
+        try:
+            driver.delete_all_cookies()
+            driver.get("about:blank")
+            return driver
+        except Exception as e_reset:
+            logger.warning("Driver unusable after lease (%s); it will be replaced on next lease.", e_reset)
+            try: driver.quit()
+            except Exception: pass
+            return None
+
+    def close(self) -> None:
+        while True:
+            try:
+                driver = self._drivers.get_nowait()
+            except queue.Empty:
+                break
+            if driver is None:
+                continue
+            try: driver.quit()
+            except Exception as e_close: logger.error("Error closing driver: %s", e_close)
@@ -0,0 +1,16 @@
+# scrapper/app/core/responses.py
+
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+
+
+class OrjsonResponse(JSONResponse):
+    """JSON response rendered by orjson, which serialises the review datetimes itself.
+
+    Local stand-in for FastAPI's deprecated ORJSONResponse, with the same options.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
@@ -1,6 +1,8 @@
-from typing import List, Optional
+from typing import List, Optional, Annotated
 from datetime import datetime
-from pydantic import BaseModel, Field, HttpUrl
+from pydantic import BaseModel, Field, StringConstraints
+
+from app.core.config import COMPARABLY_COMPANY_URL_PATTERN, MAX_URLS_PER_REQUEST
 
 class Review(BaseModel):
     text: str
@@ -14,7 +16,10 @@ class Question(BaseModel):
     question_text: str
     review_section: ReviewSection
 
+CompanyUrl = Annotated[str, StringConstraints(strip_whitespace=True, pattern=COMPARABLY_COMPANY_URL_PATTERN)]
+
 class ScrapeRequest(BaseModel):
-    urls: List[HttpUrl]
+    # Checked by pydantic-core's regex engine; the endpoint only has to pull the slug out
+    urls: List[CompanyUrl] = Field(..., min_length=1, max_length=MAX_URLS_PER_REQUEST)
     start_date_str: Optional[str] = Field(None, description="Optional start date (YYYY-MM-DD) for reviews.")
     end_date_str: Optional[str] = Field(None, description="Optional end date (YYYY-MM-DD) for reviews.")
\ No newline at end of file
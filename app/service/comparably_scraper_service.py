@@ -2,33 +2,273 @@
 
 import time
 import random
+import asyncio
 import traceback
-from typing import List, Dict, Optional, Any, Tuple
+import threading
+from contextlib import ExitStack
+from typing import List, Dict, Optional, Any, Tuple, Set, Iterator, Union
 from datetime import datetime
 from urllib.parse import urlparse, urljoin
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
-from bs4 import BeautifulSoup
+import orjson
+from lxml.cssselect import CSSSelector
 from selenium.common.exceptions import TimeoutException, NoSuchElementException, ElementClickInterceptedException
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from curl_cffi.requests import Session as CurlCffiSession, RequestsError
+from curl_cffi.requests import Session as CurlCffiSession, AsyncSession as CurlCffiAsyncSession, RequestsError
+from pydantic import TypeAdapter
 
+from app.core.driver_pool import DriverPool
 from app.schema.scrape_schema import Review, ReviewSection, Question # Pydantic models
 from app.core.config import ( # Constants
-    REVIEW_CATEGORIES, MAX_CATEGORY_PAGES, MAX_REVIEW_PAGES_PER_QUESTION,
+    REVIEW_CATEGORIES, REVIEW_CATEGORIES_SET, MAX_CATEGORY_PAGES, MAX_REVIEW_PAGES_PER_QUESTION,
     SELENIUM_ELEMENT_TIMEOUT_S, CURL_REQUEST_TIMEOUT_S, CURL_IMPERSONATE_BROWSER,
-    NEXT_PAGE_SELECTORS
+    NEXT_PAGE_SELECTORS, Q_REVIEW_CACHE_DIR, Q_REVIEW_CACHE_TTL_S,
+    SCRAPE_RESULT_CACHE_TTL_S, SCRAPE_RESULT_CACHE_MAXSIZE, Q_REVIEW_MAX_IN_FLIGHT,
+    REVIEW_NEAR_DUP_THRESHOLD, REVIEW_MINHASH_NUM_PERM, REVIEW_SHINGLE_WORDS, REVIEW_NEAR_DUP_MIN_WORDS
 )
 from app.utils.scraper_helpers import ( 
-    setup_selenium_driver, _parse_reviews_from_block, extract_company_info
+    _parse_reviews_from_block, extract_company_info,
+    parse_review_page_stream, parse_review_page_astream, parse_html, parse_category_page, element_text, element_has_class, has_class_xpath
 )
 
+_PAGINATION_SCOPE_CSS = CSSSelector(", ".join(
+    f"{tag}[class*='{p}' i]"
+    for tag in ("nav", "ul", "div")
+    for p in ("pagination", "pager", "page-links", "qa-Pagination", "cp-Pagination")
+))
+_CAT_NAV_SCOPE_CSS = (CSSSelector("nav[aria-label*='pagination' i]"), CSSSelector("ul[class*='pagination' i]"))
+# Translated to XPath once here; lxml's .cssselect() would redo that on every call. Kept separate to preserve priority order.
+_NEXT_PAGE_CSS = tuple(CSSSelector(sel) for sel in NEXT_PAGE_SELECTORS)
+# rel="next" is a single attribute test, so it is tried before the label/text heuristics in _is_usable_next_link
+_REL_NEXT_CSS = CSSSelector("a[rel~='next']:not([disabled]):not(.disabled)")
+try:
+    from diskcache import Cache
+    q_review_page_cache = Cache(Q_REVIEW_CACHE_DIR)
+except ImportError:
+    print("Warning: diskcache not installed. Q-review pages will not be cached on disk.")
+    q_review_page_cache = None
+try:
+    from cachetools import TTLCache
+    scrape_result_cache = TTLCache(maxsize=SCRAPE_RESULT_CACHE_MAXSIZE, ttl=SCRAPE_RESULT_CACHE_TTL_S)
+except ImportError:
+    print("Warning: cachetools not installed. Scrape results will not be cached in memory.")
+    scrape_result_cache = None
+_scrape_result_cache_lock = threading.Lock()  # TTLCache is not thread-safe; scrapes finish on worker threads
+try:
+    from datasketch import MinHash, MinHashLSH
+except ImportError:
+    print("Warning: datasketch not installed. Reviews will only be de-duplicated on exact text match.")
+    MinHash = MinHashLSH = None
+
+_BASE_CURL_HEADERS = {
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.9',
+    'Accept-Language': 'en-US,en;q=0.9',
+}
+
+_QUESTION_LIST_ADAPTER = TypeAdapter(List[Question])  # One pydantic-core call dumps every question
+
+_QUESTION_BLOCKS_XPATH = has_class_xpath('div', 'reviewsList', axis="//")
+_QUESTION_TITLE_XPATH = has_class_xpath('h2', 'section-subtitle')
+_IN_QUESTION_BLOCK_XPATH = has_class_xpath('div', 'reviewsList', axis="ancestor::")
+
+def _is_usable_next_link(btn) -> bool:
+    combined_test_str = f"{btn.get('aria-label', '')} {btn.get('rel', '')} {element_text(btn)}".lower()
+    if "prev" in combined_test_str: return False
+    return not (element_has_class(btn, 'disabled') or element_has_class(btn, 'inactive') or btn.get('disabled') is not None)
+
+async def _fetch_q_review_page(
+    q_async_session: CurlCffiAsyncSession,
+    url: str,
+    headers: Dict[str, str],
+    cookies: Dict[str, str],
+    start_date_filter: Optional[datetime],
+    end_date_filter: Optional[datetime]
+) -> Tuple[List[Dict], Any, str]:
+    # Page HTML (the fragment, for JSON responses) is cached; date filters are applied at parse time, so one entry serves any filter.
+    cache_key = f"v1:{url}"
+    cached = q_review_page_cache.get(cache_key) if q_review_page_cache is not None else None
+    if cached is not None:
+        body, final_url = cached
+        reviews_data, tree, _ = parse_review_page_stream((body,), start_date_filter, end_date_filter)
+        return reviews_data, tree, final_url
+
+    await asyncio.sleep(random.uniform(0.7, 1.5))
+    response = await q_async_session.get(url, headers=headers, cookies=cookies, timeout=CURL_REQUEST_TIMEOUT_S, stream=True)
+    body_chunks: List[bytes] = []
+    async def _tee_chunks():
+        async for chunk in response.aiter_content():
+            if q_review_page_cache is not None: body_chunks.append(chunk)
+            yield chunk
+    try:
+        response.raise_for_status()
+        if "json" in response.headers.get("content-type", ""):
+            # XHR pagination wraps the review markup in JSON; decode it and parse just the fragment.
+            payload = orjson.loads(b"".join([chunk async for chunk in response.aiter_content()]))
+            html_fragment = (payload.get("html") if isinstance(payload, dict) else None) or "<div></div>"
+            body_chunks = [html_fragment.encode("utf-8")]
+            reviews_data, tree, review_block_count = parse_review_page_stream(body_chunks, start_date_filter, end_date_filter)
+        else:
+            reviews_data, tree, review_block_count = await parse_review_page_astream(_tee_chunks(), start_date_filter, end_date_filter)
+    finally:
+        await response.aclose()
+    final_url = str(response.url)
+    if q_review_page_cache is not None:
+        body = b"".join(body_chunks)
+        # Only a genuine Q-review page may be cached: a challenge page or a category page served in its place
+        # (which _paginate_question_reviews rejects) would otherwise truncate every scrape of this URL until it expires.
+        if review_block_count and b"challenge-platform" not in body and not _QUESTION_TITLE_XPATH(tree):
+            q_review_page_cache.set(cache_key, (body, final_url), expire=Q_REVIEW_CACHE_TTL_S)
+    return reviews_data, tree, final_url
+
+# Returned by _fetch_server_rendered_page for pages a browser would not get either (404/410, other errors)
+_PAGE_NOT_FOUND = object()
+_BROWSER_FALLBACK_STATUS_CODES = frozenset({403, 429, 503})  # What Cloudflare answers a blocked client with
+
+def _fetch_server_rendered_page(curl_session: CurlCffiSession, url: str, headers: Dict[str, str], cookies: Dict[str, str]) -> Union[str, None, object]:
+    # Company and category pages are server-rendered. None means a challenge (or a dropped connection) that needs
+    # a real browser; _PAGE_NOT_FOUND means the page isn't there, so leasing a driver for it would be wasted.
+    # cookies is the caller's own jar: the app-wide session is told to discard Set-Cookie, which lands here instead,
+    # so one company's or request's cookies never reach another's fetches.
+    try:
+        response = curl_session.get(url, headers=headers, cookies=cookies, timeout=CURL_REQUEST_TIMEOUT_S, discard_cookies=True)
+    except RequestsError as e_cat_req:
+        print(f"  [CatPageFetch] curl_cffi Error fetching {url}: {e_cat_req}")
+        return None
+    cookies.update(response.cookies.items())
+    if response.status_code in _BROWSER_FALLBACK_STATUS_CODES or "challenge-platform" in response.text:
+        return None
+    if response.status_code != 200:
+        print(f"  [CatPageFetch] {url} returned HTTP {response.status_code}; not retrying in a browser.")
+        return _PAGE_NOT_FOUND
+    return response.text
+
+def _live_next_link_xpath(raw_href: str) -> str:
+    href_literal = f'"{raw_href}"' if "'" in raw_href else f"'{raw_href}'"
+    return f"//a[@href={href_literal} and not(ancestor::div[contains(concat(' ', normalize-space(@class), ' '), ' reviewsList ')])]"
+
+def _read_selenium_cookies(driver, page_url: str) -> Dict[str, str]:
+    # One CDP command instead of a WebDriver get_cookies() round trip. CDP returns every domain's
+    # cookies, so keep only those get_cookies() would have returned for this host.
+    host = urlparse(page_url).hostname or ""
+    try:
+        all_cookies = driver.execute_cdp_cmd("Network.getAllCookies", {})["cookies"]
+    except Exception:
+        return {c['name']: c['value'] for c in driver.get_cookies()}
+    return {
+        c['name']: c['value'] for c in all_cookies
+        if host == c['domain'].lstrip('.') or host.endswith("." + c['domain'].lstrip('.'))
+    }
+
+def _wait_for_heading(wait: WebDriverWait) -> None:
+    # Error/blocked pages may never render an <h1>; the caller's title checks handle those.
+    try:
+        wait.until(EC.presence_of_element_located((By.TAG_NAME, "h1")))
+    except TimeoutException:
+        pass
+
+def _is_near_duplicate_review(near_dup_index, review_text: str, index_key: str) -> bool:
+    # True if a similar long review was already kept in this category; otherwise indexes this one under index_key.
+    words = review_text.lower().split()
+    if near_dup_index is None or len(words) < REVIEW_NEAR_DUP_MIN_WORDS:
+        return False
+    review_minhash = MinHash(num_perm=REVIEW_MINHASH_NUM_PERM)
+    for i in range(len(words) - REVIEW_SHINGLE_WORDS + 1):
+        review_minhash.update(" ".join(words[i:i + REVIEW_SHINGLE_WORDS]).encode("utf-8"))
+    if near_dup_index.query(review_minhash):
+        return True
+    near_dup_index.insert(index_key, review_minhash)
+    return False
+
+def _find_next_q_review_href(q_reviews_segment, source_url: str) -> Optional[str]:
+    pagination_scopes_for_q = _PAGINATION_SCOPE_CSS(q_reviews_segment)
+    pagination_scope_for_q = pagination_scopes_for_q[0] if pagination_scopes_for_q else q_reviews_segment
+
+    for btn_tag in _REL_NEXT_CSS(pagination_scope_for_q):
+        href = btn_tag.get('href')
+        if href and href != "#" and not href.startswith("javascript:"):
+            return urljoin(source_url, href)
+
+    for next_page_css in _NEXT_PAGE_CSS:
+        for btn_tag in next_page_css(pagination_scope_for_q):
+            href = btn_tag.get('href')
+            if not _is_usable_next_link(btn_tag): continue
+
+            if href and href != "#" and not href.startswith("javascript:"):
+                return urljoin(source_url, href)
+    return None
+
+async def _paginate_question_reviews(
+    thread_name: str,
+    question_text: str,
+    next_q_review_page_href: str,
+    current_q_reviews_source_url: str,
+    q_async_session: CurlCffiAsyncSession,
+    base_curl_headers: Dict[str, str],
+    category_cookies: Dict[str, str],
+    stagger_slot: int,
+    start_date_filter: Optional[datetime],
+    end_date_filter: Optional[datetime]
+) -> List[Dict]:
+    # Follows one question's Q-review pages 2..N and returns their raw review dicts.
+    await asyncio.sleep(0.1 * (stagger_slot % Q_REVIEW_MAX_IN_FLIGHT))  # Staggers the questions' first requests
+    reviews_data_for_later_pages: List[Dict] = []
+    q_review_page_num = 1
+    while next_q_review_page_href and q_review_page_num < MAX_REVIEW_PAGES_PER_QUESTION:
+        q_review_page_num += 1
+        try:
+            q_review_fetch_headers = base_curl_headers.copy()
+            q_review_fetch_headers['Referer'] = current_q_reviews_source_url
+
+            reviews_data_from_current_segment, current_q_reviews_html_segment, current_q_reviews_source_url = await _fetch_q_review_page(
+                q_async_session, next_q_review_page_href, q_review_fetch_headers, category_cookies, start_date_filter, end_date_filter
+            )
+            if _QUESTION_TITLE_XPATH(current_q_reviews_html_segment):
+                print(f"        [{thread_name}] WARNING: Fetched Q-review page {next_q_review_page_href} looks like a full category page. Stopping Q-pagination.")
+                break
+        except RequestsError as e_q_rev_req:
+            status_code_msg = f" (Status: {e_q_rev_req.response.status_code})" if hasattr(e_q_rev_req, 'response') and e_q_rev_req.response else ""
+            print(f"        [{thread_name}] curl_cffi Error{status_code_msg} fetching Q-REVIEW page {next_q_review_page_href}: {e_q_rev_req}")
+            break
+        except Exception as e_gen:
+            print(f"        [{thread_name}] Generic Error Q-REVIEW page {next_q_review_page_href}: {e_gen}")
+            traceback.print_exc()
+            break
+
+        if not reviews_data_from_current_segment:
+            print(f"        [{thread_name}] No reviews on Q-Page {q_review_page_num} for '{question_text[:30]}...'.")
+        reviews_data_for_later_pages.extend(reviews_data_from_current_segment)
+        next_q_review_page_href = _find_next_q_review_href(current_q_reviews_html_segment, current_q_reviews_source_url)
+
+    return reviews_data_for_later_pages
+
+def _iter_next_category_hrefs(category_page_tree) -> Iterator[str]:
+    # Lazily yields raw hrefs of usable category "Next" links in selector priority order; callers take the first.
+    cat_page_nav_scopes = _CAT_NAV_SCOPE_CSS[0](category_page_tree) or _CAT_NAV_SCOPE_CSS[1](category_page_tree)
+    cat_page_nav_scope = cat_page_nav_scopes[0] if cat_page_nav_scopes else category_page_tree
+    for btn_s in _REL_NEXT_CSS(cat_page_nav_scope):
+        href = btn_s.get('href')
+        if href and href != '#' and not _IN_QUESTION_BLOCK_XPATH(btn_s):
+            yield href
+    for next_page_css in _NEXT_PAGE_CSS:
+        for btn_s in next_page_css(cat_page_nav_scope):
+            if _IN_QUESTION_BLOCK_XPATH(btn_s): continue
+            href = btn_s.get('href')
+            if href and href != '#' and _is_usable_next_link(btn_s):
+                yield href
+
+async def _gather_q_pagination(later_pages_coros) -> List[Any]:
+    # gather() must be created inside the running loop so its futures belong to the category's loop.
+    return await asyncio.gather(*later_pages_coros, return_exceptions=True)
+
 def _scrape_category_deep_reviews_selenium_curl(
     company_base_url_str: str,
     category_name_arg: str,
     company_slug: str,
+    curl_q_session: CurlCffiSession,
+    driver_pool: DriverPool,
     start_date_filter: Optional[datetime] = None,
     end_date_filter: Optional[datetime] = None
 ) -> Tuple[str, List[Question]]:
@@ -36,151 +276,132 @@ def _scrape_category_deep_reviews_selenium_curl(
     print(f"  [{thread_name}] Started for category: {category_name_arg}")
 
     collected_questions_for_this_category: List[Question] = []
-    processed_reviews_keys_globally_for_category = set()
+    # One 64-bit hash per kept review rather than a tuple; collisions are negligible at per-category sizes
+    processed_reviews_keys_globally_for_category: Set[int] = set()
+    # Comparably republishes some long reviews (lightly edited) under several questions; keep the first copy
+    near_dup_index = MinHashLSH(threshold=REVIEW_NEAR_DUP_THRESHOLD, num_perm=REVIEW_MINHASH_NUM_PERM) if MinHashLSH else None
 
     category_driver = None
+    category_driver_lease = ExitStack()  # Holds the pooled driver, if one is leased, until the category finishes
+    # Questions' follow-up pages go out concurrently on one AsyncSession, which multiplexes them over a
+    # single HTTP/2 connection; this loop drives it for the category's lifetime.
+    q_loop = asyncio.new_event_loop()
+    q_async_session = CurlCffiAsyncSession(
+        loop=q_loop, impersonate=CURL_IMPERSONATE_BROWSER, timeout=CURL_REQUEST_TIMEOUT_S, max_clients=Q_REVIEW_MAX_IN_FLIGHT
+    )
     try:
-        category_driver = setup_selenium_driver()
-        category_wait = WebDriverWait(category_driver, SELENIUM_ELEMENT_TIMEOUT_S)
-        category_button_wait = WebDriverWait(category_driver, max(5, SELENIUM_ELEMENT_TIMEOUT_S // 3))
-
         category_url_start = urljoin(company_base_url_str.rstrip('/') + "/", f"reviews/{category_name_arg}/")
-        print(f"  [{thread_name}] Selenium navigating to initial Cat Page: {category_url_start}")
-        category_driver.get(category_url_start)
-        time.sleep(random.uniform(1.5, 2.5))
-
-        user_agent_hdr = category_driver.execute_script("return navigator.userAgent;")
-        base_curl_headers = {
-            'User-Agent': user_agent_hdr,
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.9',
-            'Accept-Language': 'en-US,en;q=0.9',
-        }
+        # The impersonated browser supplies its own User-Agent until Selenium is needed.
+        base_curl_headers = dict(_BASE_CURL_HEADERS)
+
+        # The curl session is shared app-wide, so the category keeps its own jar: Selenium cookies (re-read only
+        # when the page changes) and Set-Cookie from its curl page fetches go here and are sent per request.
+        category_cookies: Dict[str, str] = {}
+        _last_cookie_fetch_url = None
+        current_category_page_url = category_url_start
 
         category_page_count = 0
         while category_page_count < MAX_CATEGORY_PAGES:
             category_page_count += 1
-            current_category_page_url = category_driver.current_url
-            print(f"  [{thread_name}] Selenium on Cat Page {category_page_count} (URL: {current_category_page_url})")
-
-            try:
-                category_wait.until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, "div.reviewsList, div.cppRH"))
-                )
-            except TimeoutException:
-                print(f"  [{thread_name}] Timeout waiting for review content on Cat Page {category_page_count}.")
-                if category_page_count == 1:
-                    print(f"  [{thread_name}] Initial category page for '{category_name_arg}' appears empty or inaccessible.")
-                break
-
-            current_selenium_cookies = {c['name']: c['value'] for c in category_driver.get_cookies()}
-            soup_current_category_page = BeautifulSoup(category_driver.page_source, 'html.parser')
-
-            question_blocks_on_cat_page = soup_current_category_page.find_all('div', class_='reviewsList')
+            category_page_html = None
+
+            if category_driver is None:
+                print(f"  [{thread_name}] curl_cffi fetching Cat Page {category_page_count} (URL: {current_category_page_url})")
+                category_page_html = _fetch_server_rendered_page(curl_q_session, current_category_page_url, base_curl_headers, category_cookies)
+                if category_page_html is _PAGE_NOT_FOUND:
+                    print(f"  [{thread_name}] Cat Page {category_page_count} not found; ending '{category_name_arg}'.")
+                    break
+                if category_page_html is None:
+                    print(f"  [{thread_name}] Cat Page {category_page_count} needs a browser; leasing a pooled Selenium driver for the rest of '{category_name_arg}'.")
+                    category_driver = category_driver_lease.enter_context(driver_pool.lease())
+                    category_wait = WebDriverWait(category_driver, SELENIUM_ELEMENT_TIMEOUT_S)
+                    category_button_wait = WebDriverWait(category_driver, max(5, SELENIUM_ELEMENT_TIMEOUT_S // 3))
+                    category_driver.get(current_category_page_url)
+                    base_curl_headers['User-Agent'] = category_driver.execute_script("return navigator.userAgent;")
+
+            if category_page_html is None:
+                current_category_page_url = category_driver.current_url
+                print(f"  [{thread_name}] Selenium on Cat Page {category_page_count} (URL: {current_category_page_url})")
+
+                try:
+                    category_wait.until(
+                        EC.presence_of_element_located((By.CSS_SELECTOR, "div.reviewsList, div.cppRH"))
+                    )
+                except TimeoutException:
+                    print(f"  [{thread_name}] Timeout waiting for review content on Cat Page {category_page_count}.")
+                    if category_page_count == 1:
+                        print(f"  [{thread_name}] Initial category page for '{category_name_arg}' appears empty or inaccessible.")
+                    break
+
+                if current_category_page_url != _last_cookie_fetch_url:
+                    category_cookies.update(_read_selenium_cookies(category_driver, current_category_page_url))
+                    _last_cookie_fetch_url = current_category_page_url
+                category_page_html = category_driver.page_source
+
+            current_category_page_tree = parse_category_page(category_page_html)
+
+            question_blocks_on_cat_page = _QUESTION_BLOCKS_XPATH(current_category_page_tree)
             if not question_blocks_on_cat_page and category_page_count > 1:
                  print(f"  [{thread_name}] No 'div.reviewsList' found on Cat Page {category_page_count}, was likely end.")
                  break
 
-            for q_block_idx, q_block_soup in enumerate(question_blocks_on_cat_page):
-                q_elem = q_block_soup.find('h2', class_='section-subtitle')
-                if not q_elem: continue
-                question_text = q_elem.get_text(strip=True)
+            # Question text, first-page reviews and the first next-link come from this page's tree;
+            # only the follow-up Q-review fetches fan out, since they are independent network round trips.
+            question_jobs = []
+            later_pages_coros = []
+            for q_block_idx, q_block in enumerate(question_blocks_on_cat_page):
+                q_elems = _QUESTION_TITLE_XPATH(q_block)
+                if not q_elems: continue
+                question_text = element_text(q_elems[0])
                 print(f"    [{thread_name}] Q{q_block_idx+1}: '{question_text[:60]}...'")
 
+                first_page_reviews_data = _parse_reviews_from_block(q_block, start_date_filter, end_date_filter)
+                first_next_href = _find_next_q_review_href(q_block, current_category_page_url)
+                later_pages_idx = None
+                if first_next_href:
+                    later_pages_idx = len(later_pages_coros)
+                    later_pages_coros.append(_paginate_question_reviews(
+                        thread_name, question_text, first_next_href, current_category_page_url,
+                        q_async_session, dict(base_curl_headers), category_cookies, later_pages_idx,
+                        start_date_filter, end_date_filter
+                    ))
+                question_jobs.append((question_text, first_page_reviews_data, later_pages_idx))
+
+            later_pages_results = q_loop.run_until_complete(_gather_q_pagination(later_pages_coros)) if later_pages_coros else []
+
+            # Merged in page order (not completion order) so question order stays stable
+            for question_text, first_page_reviews_data, later_pages_idx in question_jobs:
+                reviews_data_for_this_q = list(first_page_reviews_data)
+                if later_pages_idx is not None:
+                    later_pages = later_pages_results[later_pages_idx]
+                    if isinstance(later_pages, Exception):
+                        print(f"        [{thread_name}] Q-review pagination failed for '{question_text[:30]}...': {later_pages}")
+                    else:
+                        reviews_data_for_this_q.extend(later_pages)
+
                 all_reviews_for_this_q_pydantic: List[Review] = [] # For Pydantic models
-                current_q_reviews_html_segment = q_block_soup
-                current_q_reviews_source_url = current_category_page_url
-
-                with CurlCffiSession(impersonate=CURL_IMPERSONATE_BROWSER) as curl_q_session:
-                    curl_q_session.cookies.update(current_selenium_cookies)
-
-                    q_review_page_num = 0
-                    while q_review_page_num < MAX_REVIEW_PAGES_PER_QUESTION:
-                        q_review_page_num += 1
-
-                        # _parse_reviews_from_block now returns list of dicts
-                        reviews_data_from_current_segment = _parse_reviews_from_block(
-                            current_q_reviews_html_segment, start_date_filter, end_date_filter
-                        )
-
-                        newly_added_this_q_sub_page_count = 0
-                        for r_data in reviews_data_from_current_segment:
-                            # Convert dict to Pydantic model here
-                            r_parsed = Review(**r_data)
-                            r_key = (hash(question_text), hash(r_parsed.text), r_parsed.date)
-                            if r_key not in processed_reviews_keys_globally_for_category:
-                                all_reviews_for_this_q_pydantic.append(r_parsed)
-                                processed_reviews_keys_globally_for_category.add(r_key)
-                                newly_added_this_q_sub_page_count +=1
-
-                        if newly_added_this_q_sub_page_count > 0:
-                            print(f"        [{thread_name}] Added {newly_added_this_q_sub_page_count} unique reviews for this Q (Q-Page {q_review_page_num}).")
-                        elif q_review_page_num > 1 and not reviews_data_from_current_segment:
-                            print(f"        [{thread_name}] No reviews on Q-Page {q_review_page_num} for '{question_text[:30]}...'.")
-
-
-                        next_q_review_page_href = None
-                        pagination_scope_for_q = current_q_reviews_html_segment.find(['nav', 'ul', 'div'],
-                            class_=lambda x: x and any(p in x.lower() for p in ['pagination', 'pager', 'page-links', 'qa-Pagination', 'cp-Pagination']),
-                            recursive=True
-                        ) or current_q_reviews_html_segment
-
-                        for sel in NEXT_PAGE_SELECTORS:
-                            buttons = pagination_scope_for_q.select(sel)
-                            for btn_tag in buttons:
-                                href = btn_tag.get('href')
-
-                                aria_label_str_q_btn = btn_tag.get("aria-label", "")
-                                rel_value_q_btn = btn_tag.get("rel")
-                                rel_str_q_btn = ""
-                                if isinstance(rel_value_q_btn, list):
-                                    rel_str_q_btn = " ".join(rel_value_q_btn)
-                                elif rel_value_q_btn:
-                                    rel_str_q_btn = rel_value_q_btn
-                                text_content_str_q_btn = btn_tag.get_text(strip=True)
-                                combined_test_str_q_btn = f"{aria_label_str_q_btn} {rel_str_q_btn} {text_content_str_q_btn}".lower()
-                                current_btn_is_prev = "prev" in combined_test_str_q_btn
-
-                                current_btn_is_disabled = any(cls in (btn_tag.get('class', [])) for cls in ['disabled', 'inactive']) or btn_tag.has_attr('disabled')
-
-                                if current_btn_is_prev or current_btn_is_disabled: continue
-
-                                if href and href != "#" and not href.startswith("javascript:"):
-                                    next_q_review_page_href = urljoin(current_q_reviews_source_url, href)
-                                    break
-                            if next_q_review_page_href: break
-
-                        if not next_q_review_page_href: break
-
-                        try:
-                            time.sleep(random.uniform(0.7, 1.5))
-                            q_review_fetch_headers = base_curl_headers.copy()
-                            q_review_fetch_headers['Referer'] = current_q_reviews_source_url
-
-                            response_q_review_page = curl_q_session.get(next_q_review_page_href, headers=q_review_fetch_headers, timeout=CURL_REQUEST_TIMEOUT_S)
-                            response_q_review_page.raise_for_status()
-
-                            current_q_reviews_html_segment = BeautifulSoup(response_q_review_page.text, 'html.parser')
-                            current_q_reviews_source_url = str(response_q_review_page.url)
-                            if current_q_reviews_html_segment.find('h2', class_='section-subtitle'):
-                                print(f"        [{thread_name}] WARNING: Fetched Q-review page {next_q_review_page_href} looks like a full category page. Stopping Q-pagination.")
-                                current_q_reviews_html_segment = BeautifulSoup("", 'html.parser')
-                                break
-                        except RequestsError as e_q_rev_req:
-                            status_code_msg = f" (Status: {e_q_rev_req.response.status_code})" if hasattr(e_q_rev_req, 'response') and e_q_rev_req.response else ""
-                            print(f"        [{thread_name}] curl_cffi Error{status_code_msg} fetching Q-REVIEW page {next_q_review_page_href}: {e_q_rev_req}")
-                            break
-                        except Exception as e_gen:
-                            print(f"        [{thread_name}] Generic Error Q-REVIEW page {next_q_review_page_href}: {e_gen}")
-                            traceback.print_exc()
-                            break
+                for r_data in reviews_data_for_this_q:
+                    r_key = hash((question_text, r_data['text'], r_data['date']))
+                    if r_key in processed_reviews_keys_globally_for_category:
+                        continue
+                    if _is_near_duplicate_review(near_dup_index, r_data['text'], str(len(processed_reviews_keys_globally_for_category))):
+                        continue
+                    # Only kept reviews become models; the parser already yields a str and a datetime, so skip validation
+                    all_reviews_for_this_q_pydantic.append(Review.model_construct(**r_data))
+                    processed_reviews_keys_globally_for_category.add(r_key)
+                if all_reviews_for_this_q_pydantic:
+                    print(f"        [{thread_name}] Added {len(all_reviews_for_this_q_pydantic)} unique reviews for '{question_text[:30]}...'.")
 
                 if all_reviews_for_this_q_pydantic:
                     all_reviews_for_this_q_pydantic.sort(key=lambda r: r.date, reverse=True)
                     existing_q_obj = next((q for q in collected_questions_for_this_category if q.question_text == question_text), None)
                     if existing_q_obj:
+                        existing_review_keys = {(hash(er.text), er.date) for er in existing_q_obj.review_section.reviews}
                         for r_new in all_reviews_for_this_q_pydantic:
-                            if not any(er.text == r_new.text and er.date == r_new.date for er in existing_q_obj.review_section.reviews):
+                            r_new_key = (hash(r_new.text), r_new.date)
+                            if r_new_key not in existing_review_keys:
                                 existing_q_obj.review_section.reviews.append(r_new)
+                                existing_review_keys.add(r_new_key)
                         existing_q_obj.review_section.reviews.sort(key=lambda r: r.date, reverse=True)
                     else:
                         print(f"    [{thread_name}] Creating ReviewSection with section_name: {category_name_arg} for Q: '{question_text[:30]}'")
@@ -190,143 +411,165 @@ def _scrape_category_deep_reviews_selenium_curl(
 
 
             next_category_page_button = None
-            cat_page_nav_scope = soup_current_category_page.find('nav', attrs={'aria-label': lambda x: x and 'pagination' in x.lower()}) or \
-                                 soup_current_category_page.find('ul', class_=lambda x: x and 'pagination' in x.lower()) or \
-                                 soup_current_category_page
-
-            for sel in NEXT_PAGE_SELECTORS:
-                potential_btns_soup = cat_page_nav_scope.select(sel)
-                for btn_s in potential_btns_soup:
-                    if btn_s.find_parent('div', class_='reviewsList'): continue
-
-                    aria_label_str_cat_btn = btn_s.get("aria-label", "")
-                    rel_value_cat_btn = btn_s.get("rel")
-                    rel_str_cat_btn = ""
-                    if isinstance(rel_value_cat_btn, list):
-                        rel_str_cat_btn = " ".join(rel_value_cat_btn)
-                    elif rel_value_cat_btn:
-                        rel_str_cat_btn = rel_value_cat_btn
-                    text_content_str_cat_btn = btn_s.get_text(strip=True)
-                    combined_test_str_cat_btn = f"{aria_label_str_cat_btn} {rel_str_cat_btn} {text_content_str_cat_btn}".lower()
-                    current_cat_btn_is_prev = "prev" in combined_test_str_cat_btn
-                    
-                    current_cat_btn_is_disabled = any(cls in (btn_s.get('class', [])) for cls in ['disabled', 'inactive']) or btn_s.has_attr('disabled')
-
-                    if not current_cat_btn_is_prev and not current_cat_btn_is_disabled and btn_s.get('href') and btn_s.get('href') != '#':
-                        try:
-                            selenium_btns = category_driver.find_elements(By.CSS_SELECTOR, sel)
-                            for sel_btn in selenium_btns:
-                                if sel_btn.is_displayed() and sel_btn.get_attribute('href') == urljoin(current_category_page_url, btn_s.get('href')):
-                                    try:
-                                        sel_btn.find_element(By.XPATH, "./ancestor::div[contains(@class, 'reviewsList')]")
-                                        continue
-                                    except NoSuchElementException:
-                                        pass
-
-                                    sel_aria_label = (sel_btn.get_attribute("aria-label") or "").lower()
-                                    sel_rel = (sel_btn.get_attribute("rel") or "").lower()
-                                    if "prev" not in sel_aria_label and "prev" not in sel_rel :
-                                        next_category_page_button = category_button_wait.until(EC.element_to_be_clickable(sel_btn))
-                                        if next_category_page_button: break
-                            if next_category_page_button: break
-                        except (NoSuchElementException, TimeoutException): continue
-                if next_category_page_button: break
+            next_category_page_raw_href = next(_iter_next_category_hrefs(current_category_page_tree), None)
+            next_category_page_href = urljoin(current_category_page_url, next_category_page_raw_href) if next_category_page_raw_href else None
+
+            if category_driver is None:
+                if not next_category_page_href:
+                    print(f"  [{thread_name}] No 'Next Category Page' link found after Cat Page {category_page_count}.")
+                    break
+                current_category_page_url = next_category_page_href
+                continue
+
+            # The link was chosen from page_source above; find that same element in the live DOM with one query
+            if next_category_page_raw_href:
+                try:
+                    live_next_btns = category_driver.find_elements(By.XPATH, _live_next_link_xpath(next_category_page_raw_href))
+                    if live_next_btns:
+                        next_category_page_button = category_button_wait.until(EC.element_to_be_clickable(live_next_btns[0]))
+                except TimeoutException:
+                    pass
 
             if not next_category_page_button :
                 print(f"  [{thread_name}] No clickable 'Next Category Page' button found by Selenium after Cat Page {category_page_count}.")
                 break
 
+            # Marker from the current page; once it goes stale the next page's DOM is live.
+            try:
+                old_first_question = category_driver.find_element(By.CSS_SELECTOR, "div.reviewsList h2.section-subtitle")
+            except NoSuchElementException:
+                old_first_question = category_driver.find_element(By.TAG_NAME, "html")
+
             print(f"  [{thread_name}] Selenium clicking 'Next Category Page'...")
             try:
                 category_driver.execute_script("arguments[0].scrollIntoView({behavior: 'auto', block: 'center'});", next_category_page_button)
                 time.sleep(0.3)
                 next_category_page_button.click()
-                time.sleep(random.uniform(2.0, 3.5))
             except ElementClickInterceptedException:
                 print(f"  [{thread_name}] Click intercepted, trying JS click for 'Next Category Page'...")
                 category_driver.execute_script("arguments[0].click();", next_category_page_button)
-                time.sleep(random.uniform(2.0, 3.5))
             except Exception as e_click:
                 print(f"  [{thread_name}] Error clicking 'Next Category Page': {e_click}")
                 break
 
+            try:
+                category_wait.until(EC.staleness_of(old_first_question))
+            except TimeoutException:
+                print(f"  [{thread_name}] Previous Cat Page content did not go stale after click; continuing with presence check.")
+
     except Exception as e_cat_main:
         print(f"  [{thread_name}] MAJOR ERROR in category '{category_name_arg}': {e_cat_main}")
         traceback.print_exc()
     finally:
-        if category_driver:
-            category_driver.quit()
+        category_driver_lease.close()
+        try: q_loop.run_until_complete(q_async_session.close())
+        except Exception as e_q_close: print(f"  [{thread_name}] Error closing Q-review session: {e_q_close}")
+        q_loop.close()
 
     print(f"  [{thread_name}] Finished category '{category_name_arg}'. Total Qs: {len(collected_questions_for_this_category)}")
     return category_name_arg, collected_questions_for_this_category
 
 
+def _scrape_result_cache_key(company_base_url_str: str, start_date_filter: Optional[datetime], end_date_filter: Optional[datetime]) -> Tuple[str, Optional[str], Optional[str]]:
+    return (
+        company_base_url_str,
+        start_date_filter.isoformat() if start_date_filter else None,
+        end_date_filter.isoformat() if end_date_filter else None,
+    )
+
+def get_cached_scrape_result(
+    company_base_url_str: str,
+    start_date_filter: Optional[datetime] = None,
+    end_date_filter: Optional[datetime] = None
+) -> Optional[Dict[str, Any]]:
+    if scrape_result_cache is None:
+        return None
+    with _scrape_result_cache_lock:
+        return scrape_result_cache.get(_scrape_result_cache_key(company_base_url_str, start_date_filter, end_date_filter))
+
 def scrape_comparably_sync(
     company_base_url_str: str,
     company_slug: str,
+    curl_session: CurlCffiSession,
+    driver_pool: DriverPool,
+    category_executor: ThreadPoolExecutor,
     start_date_filter: Optional[datetime] = None,
     end_date_filter: Optional[datetime] = None
 ) -> Dict[str, Any]:
+    cached_result = get_cached_scrape_result(company_base_url_str, start_date_filter, end_date_filter)
+    if cached_result is not None:
+        print(f"  [{company_slug}] Serving scrape result from in-memory cache.")
+        return cached_result
+
     print(f"Orchestrating SELENIUM_CAT_CURL_Q_REVIEW parallel category scrape for: {company_slug}")
     start_time_total = time.time()
     all_questions_for_company: List[Question] = []
     company_details_overall: Dict[str, Any] = {}
-    initial_info_driver = None
 
     try:
-        print(f"  [{company_slug}] Fetching initial company info with Selenium...")
-        initial_info_driver = setup_selenium_driver()
         info_fetch_url = urljoin(company_base_url_str.rstrip('/') + "/", "reviews/")
-        initial_info_driver.get(info_fetch_url)
-        time.sleep(random.uniform(1.8,2.5))
-        if "Error" in initial_info_driver.title or "Not Found" in initial_info_driver.title or "Access Denied" in initial_info_driver.page_source:
-            print(f"  [{company_slug}] /reviews/ page for info failed (Title: {initial_info_driver.title}), trying base URL: {company_base_url_str}")
-            initial_info_driver.get(company_base_url_str)
-            time.sleep(random.uniform(1.8,2.5))
-            if "Error" in initial_info_driver.title or "Not Found" in initial_info_driver.title or "Access Denied" in initial_info_driver.page_source:
-                raise Exception(f"Could not load a valid page for company info (Title: {initial_info_driver.title})")
-        info_html = initial_info_driver.page_source
-        info_soup = BeautifulSoup(info_html, 'html.parser')
-        company_details_overall = extract_company_info(info_soup, company_base_url_str) # From helpers
+        info_html = None
+        info_needs_browser = False
+        for info_candidate_url in (info_fetch_url, company_base_url_str):
+            print(f"  [{company_slug}] curl_cffi fetching company info ({info_candidate_url})...")
+            info_html = _fetch_server_rendered_page(curl_session, info_candidate_url, _BASE_CURL_HEADERS, {})
+            if info_html is None: info_needs_browser = True
+            elif info_html is not _PAGE_NOT_FOUND: break
+
+        if info_html is _PAGE_NOT_FOUND and not info_needs_browser:
+            raise Exception("Company page not found (HTTP 404/410 or error) for both /reviews/ and the base URL")
+        if info_html is None or info_html is _PAGE_NOT_FOUND:
+            print(f"  [{company_slug}] Company info needs a browser; leasing a pooled Selenium driver...")
+            with driver_pool.lease() as initial_info_driver:
+                info_wait = WebDriverWait(initial_info_driver, SELENIUM_ELEMENT_TIMEOUT_S)
+                initial_info_driver.get(info_fetch_url)
+                _wait_for_heading(info_wait)
+                if "Error" in initial_info_driver.title or "Not Found" in initial_info_driver.title or "Access Denied" in initial_info_driver.page_source:
+                    print(f"  [{company_slug}] /reviews/ page for info failed (Title: {initial_info_driver.title}), trying base URL: {company_base_url_str}")
+                    initial_info_driver.get(company_base_url_str)
+                    _wait_for_heading(info_wait)
+                    if "Error" in initial_info_driver.title or "Not Found" in initial_info_driver.title or "Access Denied" in initial_info_driver.page_source:
+                        raise Exception(f"Could not load a valid page for company info (Title: {initial_info_driver.title})")
+                info_html = initial_info_driver.page_source
+        company_details_overall = extract_company_info(parse_html(info_html), company_base_url_str) # From helpers
         print(f"  [{company_slug}] Initial company info fetched: Name='{company_details_overall.get('company_name')}'")
     except Exception as e_info:
         print(f"  [{company_slug}] Error fetching initial company info: {e_info}")
         company_details_overall = {"company_name": company_slug.replace('-', ' ').title(), "comparably_url": company_base_url_str, "status_note": f"Initial info fetch error: {str(e_info)}"}
-    finally:
-        if initial_info_driver:
-            try: initial_info_driver.quit()
-            except Exception as e_close: print(f"  [{company_slug}] Error closing Selenium info browser: {e_close}")
 
-    max_concurrent_categories = min(len(REVIEW_CATEGORIES), 3)
-    print(f"  [{company_slug}] Starting SELENIUM_CAT_CURL_Q_REVIEW parallel scrape for {len(REVIEW_CATEGORIES)} categories (max {max_concurrent_categories} concurrent)...")
+    # Categories are independent and mostly curl_cffi I/O (a pooled Chrome is leased only on a challenge), so run them all at once.
+    # The executor is app-wide (main.lifespan): curl_cffi keeps its curl handles per thread, so long-lived category
+    # threads are what let the shared session reuse connections across companies and requests.
+    print(f"  [{company_slug}] Starting SELENIUM_CAT_CURL_Q_REVIEW parallel scrape for {len(REVIEW_CATEGORIES)} categories...")
     futures_map = {}
-    with ThreadPoolExecutor(max_workers=max_concurrent_categories, thread_name_prefix="SelCatCurlQPool") as executor:
-        for cat_name_from_list in REVIEW_CATEGORIES:
-            future = executor.submit(
-                _scrape_category_deep_reviews_selenium_curl,
-                company_base_url_str,
-                cat_name_from_list,
-                company_slug,
-                start_date_filter,
-                end_date_filter
-            )
-            futures_map[future] = cat_name_from_list
-
-        for future in as_completed(futures_map):
-            original_category_name_processed = futures_map[future]
-            try:
-                processed_cat_name, questions_from_category = future.result()
-                if processed_cat_name != original_category_name_processed:
-                     print(f"  [{company_slug}] WARNING: Mismatch in returned category name. Expected '{original_category_name_processed}', got '{processed_cat_name}'.")
-
-                if questions_from_category:
-                    print(f"  [{company_slug}] Received {len(questions_from_category)} Qs from cat '{original_category_name_processed}'. Merging...")
-                    all_questions_for_company.extend(questions_from_category)
-                else:
-                    print(f"  [{company_slug}] Cat '{original_category_name_processed}' returned no Qs.")
-            except Exception as e_future_exc:
-                print(f"  [{company_slug}] SELENIUM_CAT_CURL_Q_REVIEW Category task for '{original_category_name_processed}' FAILED in executor: {e_future_exc}")
-                traceback.print_exc()
+    for cat_name_from_list in REVIEW_CATEGORIES:
+        future = category_executor.submit(
+            _scrape_category_deep_reviews_selenium_curl,
+            company_base_url_str,
+            cat_name_from_list,
+            company_slug,
+            curl_session,
+            driver_pool,
+            start_date_filter,
+            end_date_filter
+        )
+        futures_map[future] = cat_name_from_list
+
+    for future in as_completed(futures_map):
+        original_category_name_processed = futures_map[future]
+        try:
+            processed_cat_name, questions_from_category = future.result()
+            if processed_cat_name != original_category_name_processed:
+                 print(f"  [{company_slug}] WARNING: Mismatch in returned category name. Expected '{original_category_name_processed}', got '{processed_cat_name}'.")
+
+            if questions_from_category:
+                print(f"  [{company_slug}] Received {len(questions_from_category)} Qs from cat '{original_category_name_processed}'. Merging...")
+                all_questions_for_company.extend(questions_from_category)
+            else:
+                print(f"  [{company_slug}] Cat '{original_category_name_processed}' returned no Qs.")
+        except Exception as e_future_exc:
+            print(f"  [{company_slug}] SELENIUM_CAT_CURL_Q_REVIEW Category task for '{original_category_name_processed}' FAILED in executor: {e_future_exc}")
+            traceback.print_exc()
 
     total_duration = time.time() - start_time_total
     print(f"\nFinished ALL SELENIUM_CAT_CURL_Q_REVIEW scrapes for {company_slug} in {total_duration:.2f}s. Total Qs collected: {len(all_questions_for_company)}")
@@ -334,14 +577,18 @@ def scrape_comparably_sync(
     if not company_details_overall.get("company_name") or company_details_overall.get("company_name", "").lower() == company_slug.lower() or company_details_overall.get("company_name", "") == "unknown_company":
         current_name = company_details_overall.get("company_name", "unknown_company")
         fallback_name = company_slug.replace('-', ' ').title()
-        if current_name.lower() in REVIEW_CATEGORIES or current_name == "unknown_company":
+        if current_name.lower() in REVIEW_CATEGORIES_SET or current_name == "unknown_company":
              company_details_overall["company_name"] = fallback_name
              if "status_note" not in company_details_overall: company_details_overall["status_note"] = "Name set to fallback slug-based name."
 
-    return {
+    scrape_result = {
         "status": "success" if all_questions_for_company or (company_details_overall.get("company_name") != company_slug.replace('-', ' ').title() and company_details_overall.get("company_name") != "unknown_company") else "partial_success_no_reviews",
         "data": {
             "company_info": company_details_overall,
-            "reviews": [q.model_dump(mode='json') for q in all_questions_for_company] # Use Pydantic's model_dump
+            "reviews": _QUESTION_LIST_ADAPTER.dump_python(all_questions_for_company) # Datetimes left as-is; orjson serialises them
         }
-    }
\ No newline at end of file
+    }
+    if scrape_result_cache is not None and scrape_result["status"] == "success":  # Don't pin partial/blocked runs for the TTL
+        with _scrape_result_cache_lock:
+            scrape_result_cache[_scrape_result_cache_key(company_base_url_str, start_date_filter, end_date_filter)] = scrape_result
+    return scrape_result
@@ -1,15 +1,18 @@
 import re
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Iterable, AsyncIterable, Tuple
 from urllib.parse import urlparse
 import traceback
+import threading
+from functools import lru_cache
 
-from bs4 import BeautifulSoup
+from lxml import etree
+from lxml import html as lxml_html
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from webdriver_manager.chrome import ChromeDriverManager
 
-from app.core.config import SELENIUM_PAGE_TIMEOUT_S, REVIEW_CATEGORIES # Import constants
+from app.core.config import SELENIUM_PAGE_TIMEOUT_S, REVIEW_CATEGORIES_SET # Import constants
 
 # --- User Agent ---
 try:
@@ -28,54 +31,164 @@ def extract_section_name_from_url(href: Optional[str]) -> str:
     match = re.search(r'/reviews/(\w+)', href)
     return match.group(1) if match else "unknown_section"
 
+def has_class_xpath(tag: str, class_name: str, axis: str = ".//") -> etree.XPath:
+    return etree.XPath(f"{axis}{tag}[contains(concat(' ', normalize-space(@class), ' '), ' {class_name} ')]")
+
+# The review block layout is fixed, so the extractor XPaths are compiled once at import
+# and evaluated in libxml2 instead of walking the tree from Python.
+_REVIEW_BLOCKS_XPATH = has_class_xpath('div', 'cppRH')
+_REVIEW_QUOTE_XPATH = has_class_xpath('p', 'cppRH-review-quote')
+_REVIEW_DATE_XPATH = etree.XPath(
+    ".//cite[contains(concat(' ', normalize-space(@class), ' '), ' cppRH-review-cite ')][1]//meta[@itemprop='datePublished']/@content"
+)
+_REVIEW_CITE_META_CONTENT_XPATH = etree.XPath(
+    ".//cite[contains(concat(' ', normalize-space(@class), ' '), ' cppRH-review-cite ')][1]//meta/@content"
+)
+_TEXT_NODES_XPATH = etree.XPath(".//text()")
+_ISO_DATE_RE = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+
+# Whitespace-only text and comments are never read, so the parsers drop them at build time.
+# lxml parsers serialise concurrent use, so each thread keeps its own.
+_parser_local = threading.local()
+
+def parse_html(html_text: str) -> lxml_html.HtmlElement:
+    parser = getattr(_parser_local, "html_parser", None)
+    if parser is None:
+        parser = _parser_local.html_parser = lxml_html.HTMLParser(remove_blank_text=True, remove_comments=True)
+    return lxml_html.fromstring(html_text, parser=parser)
+
+_CATEGORY_PAGE_FEED_CHARS = 64 * 1024
+_CATEGORY_PAGE_SKIPPED_TAGS = ("script", "style", "svg", "noscript")
+
+def parse_category_page(html_text: str) -> etree._Element:
+    """Parses a category page, emptying script/style/svg subtrees as soon as each closes.
+
+    Those branches are most of a category page's bytes and nothing reads them, so
+    feeding in slices keeps them from accumulating in the resident tree.
+    """
+    parser = etree.HTMLPullParser(
+        events=("end",), tag=_CATEGORY_PAGE_SKIPPED_TAGS, remove_blank_text=True, remove_comments=True
+    )
+    for offset in range(0, len(html_text), _CATEGORY_PAGE_FEED_CHARS):
+        parser.feed(html_text[offset:offset + _CATEGORY_PAGE_FEED_CHARS])
+        for _, elem in parser.read_events():
+            elem.clear(keep_tail=True)
+    return parser.close()
+
+def element_text(elem: etree._Element) -> str:
+    # lxml counterpart of BeautifulSoup's get_text(strip=True)
+    return "".join(t.strip() for t in _TEXT_NODES_XPATH(elem))
+
+def element_has_class(elem: etree._Element, class_name: str) -> bool:
+    return class_name in (elem.get('class') or '').split()
+
+@lru_cache(maxsize=1024)
+def _parse_review_date(date_str: str) -> Optional[datetime]:
+    # Review dates repeat heavily across a company's pages, and strptime is the costliest step per review.
+    try:
+        return datetime.strptime(date_str, '%Y-%m-%d')
+    except ValueError:
+        return None
+
+def _parse_review_element(
+    block: etree._Element,
+    start_date_filter: Optional[datetime],
+    end_date_filter: Optional[datetime],
+) -> Optional[Dict]:
+    # Date is a plain attribute read, so filter on it before paying for text extraction.
+    date_strs = _REVIEW_DATE_XPATH(block) or [c for c in _REVIEW_CITE_META_CONTENT_XPATH(block) if _ISO_DATE_RE.match(c)]
+    if not date_strs or not date_strs[0]: return None
+    date_val = _parse_review_date(date_strs[0])
+    if date_val is None: return None
+    if start_date_filter and date_val < start_date_filter: return None
+    if end_date_filter and date_val > end_date_filter: return None
+    quotes = _REVIEW_QUOTE_XPATH(block)
+    if not quotes: return None
+    return {"text": element_text(quotes[0]).replace('\u0000', ''), "date": date_val}
+
 def _parse_reviews_from_block(
-    review_container_soup: BeautifulSoup,
+    review_container: etree._Element,
     start_date_filter: Optional[datetime],
     end_date_filter: Optional[datetime],
    
 ) -> List[Dict]: # Returning list of dicts to be converted to Review model later
     reviews_found: List[Dict] = []
-    review_blocks = review_container_soup.find_all('div', class_='cppRH')
-    for block_idx, block in enumerate(review_blocks):
-        quote = block.find('p', class_='cppRH-review-quote')
-        if not quote: continue
-        text = quote.get_text(strip=True).replace('\u0000', '')
-        cite_block = block.find('cite', class_='cppRH-review-cite')
-        date_meta_tag = None
-        if cite_block:
-            date_meta_tag = cite_block.find('meta', {'itemprop': 'datePublished'}) or \
-                         cite_block.find('meta', attrs={'content': re.compile(r'^\d{4}-\d{2}-\d{2}$')})
-        if not date_meta_tag or not date_meta_tag.get('content'): continue
-        try:
-            date_str = date_meta_tag['content']
-            date_val = datetime.strptime(date_str, '%Y-%m-%d')
-        except ValueError:
-            # print(f"  [ParseReviewBlock] Error parsing date: {date_str} for review text: {text[:50]}...") 
-            continue
-        if start_date_filter and date_val < start_date_filter: continue
-        if end_date_filter and date_val > end_date_filter: continue
-        reviews_found.append({"text": text, "date": date_val}) # Store as dict
+    for block in _REVIEW_BLOCKS_XPATH(review_container):
+        review_data = _parse_review_element(block, start_date_filter, end_date_filter)
+        if review_data: reviews_found.append(review_data)
     return reviews_found
 
-def extract_company_info(soup: BeautifulSoup, company_base_url_str: str) -> Dict:
+def parse_review_page_stream(
+    chunks: Iterable[bytes],
+    start_date_filter: Optional[datetime],
+    end_date_filter: Optional[datetime],
+) -> Tuple[List[Dict], etree._Element, int]:
+    """Incrementally parses a Q-review page, extracting each div.cppRH as soon as it closes.
+
+    Review subtrees are cleared once read, so the returned tree only keeps what the
+    pagination lookup needs; the review block count is returned alongside since the
+    cleared blocks can no longer be found in it.
+    """
+    parser = _new_review_pull_parser()
+    reviews_found: List[Dict] = []
+    review_block_count = 0
+    for chunk in chunks:
+        review_block_count += _feed_review_chunk(parser, chunk, reviews_found, start_date_filter, end_date_filter)
+    return reviews_found, parser.close(), review_block_count
+
+async def parse_review_page_astream(
+    chunks: AsyncIterable[bytes],
+    start_date_filter: Optional[datetime],
+    end_date_filter: Optional[datetime],
+) -> Tuple[List[Dict], etree._Element, int]:
+    """Async counterpart of parse_review_page_stream for AsyncSession responses."""
+    parser = _new_review_pull_parser()
+    reviews_found: List[Dict] = []
+    review_block_count = 0
+    async for chunk in chunks:
+        review_block_count += _feed_review_chunk(parser, chunk, reviews_found, start_date_filter, end_date_filter)
+    return reviews_found, parser.close(), review_block_count
+
+def _new_review_pull_parser() -> etree.HTMLPullParser:
+    return etree.HTMLPullParser(events=("end",), remove_blank_text=True, remove_comments=True)
+
+def _feed_review_chunk(
+    parser: etree.HTMLPullParser,
+    chunk: bytes,
+    reviews_found: List[Dict],
+    start_date_filter: Optional[datetime],
+    end_date_filter: Optional[datetime],
+) -> int:
+    # Returns how many review blocks closed in this chunk
+    review_block_count = 0
+    parser.feed(chunk)
+    for _, elem in parser.read_events():
+        if elem.tag == 'div' and element_has_class(elem, 'cppRH'):
+            review_block_count += 1
+            review_data = _parse_review_element(elem, start_date_filter, end_date_filter)
+            if review_data: reviews_found.append(review_data)
+            elem.clear()
+    return review_block_count
+
+def extract_company_info(page_root: etree._Element, company_base_url_str: str) -> Dict:
     details = {}
     try:
         parsed_base_url = urlparse(str(company_base_url_str)); path_parts = parsed_base_url.path.strip('/').split('/')
         company_slug_from_base = path_parts[1] if len(path_parts) > 1 else "unknown_company"
         default_name = company_slug_from_base.replace('-', ' ').title(); details['company_name'] = default_name
         details['comparably_url'] = str(company_base_url_str)
-        name_tag_h1 = soup.find('h1')
-        if name_tag_h1:
-            h1_text = name_tag_h1.get_text(strip=True)
+        name_tag_h1 = page_root.find('.//h1')
+        if name_tag_h1 is not None:
+            h1_text = element_text(name_tag_h1)
             name_candidate = h1_text
             if " Reviews" in h1_text: name_candidate = h1_text.split(" Reviews")[0].strip()
-            if name_candidate and name_candidate.lower() not in REVIEW_CATEGORIES and len(name_candidate) > 3:
+            if name_candidate and name_candidate.lower() not in REVIEW_CATEGORIES_SET and len(name_candidate) > 3:
                 details['company_name'] = name_candidate
-        if details['company_name'] == default_name or details['company_name'].lower() in REVIEW_CATEGORIES:
-            title_tag = soup.find('title')
-            if title_tag:
-                title_text = title_tag.get_text(strip=True); name_from_title = title_text.split(" Reviews")[0].split(" | Comparably")[0].strip()
-                if name_from_title and len(name_from_title) > 3 and name_from_title.lower() not in REVIEW_CATEGORIES:
+        if details['company_name'] == default_name or details['company_name'].lower() in REVIEW_CATEGORIES_SET:
+            title_tag = page_root.find('.//title')
+            if title_tag is not None:
+                title_text = element_text(title_tag); name_from_title = title_text.split(" Reviews")[0].split(" | Comparably")[0].strip()
+                if name_from_title and len(name_from_title) > 3 and name_from_title.lower() not in REVIEW_CATEGORIES_SET:
                      details['company_name'] = name_from_title
     except Exception as e: print(f"Error extracting company details for {company_base_url_str}: {e}")
     return details
@@ -1,18 +1,51 @@
 # scrapper/main.py
 
+import asyncio
+from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor
+
 from fastapi import FastAPI
+from app.core.responses import OrjsonResponse
+from curl_cffi.requests import Session as CurlCffiSession
 from app.api.scrape_endpoint import router as scrape_router
-from app.core.config import API_TITLE, API_DESCRIPTION, API_VERSION
+from app.core.driver_pool import DriverPool
+from app.core.config import API_TITLE, API_DESCRIPTION, API_VERSION, CURL_IMPERSONATE_BROWSER, CURL_REQUEST_TIMEOUT_S, MAX_CONCURRENT_SCRAPES, REVIEW_CATEGORIES
 import logging
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s | %(name)s | %(message)s"
 )
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One curl_cffi session for the whole process so scrapes reuse pooled connections
+    app.state.curl_session = CurlCffiSession(impersonate=CURL_IMPERSONATE_BROWSER, timeout=CURL_REQUEST_TIMEOUT_S)
+    # Created here so it binds to the server's running loop; shared by every /scrape call
+    app.state.scrape_semaphore = asyncio.Semaphore(MAX_CONCURRENT_SCRAPES)
+    # One browser per concurrent scrape, launched once instead of per company
+    app.state.driver_pool = await asyncio.to_thread(DriverPool, MAX_CONCURRENT_SCRAPES)
+    # Scrapes get their own threads, sized to the pool, instead of the shared default executor
+    app.state.scrape_executor = ThreadPoolExecutor(max_workers=MAX_CONCURRENT_SCRAPES, thread_name_prefix="scrape")
+    # Every scrape's categories run here; separate from scrape_executor so a scrape never waits on its own pool's threads.
+    # The threads outlive each company, and with them curl_cffi's per-thread handles and their warm connections.
+    app.state.category_executor = ThreadPoolExecutor(
+        max_workers=MAX_CONCURRENT_SCRAPES * len(REVIEW_CATEGORIES), thread_name_prefix="SelCatCurlQPool"
+    )
+    try:
+        yield
+    finally:
+        # Waits for in-flight scrapes off the event loop, like the pool close below
+        await asyncio.to_thread(app.state.scrape_executor.shutdown, wait=True)
+        await asyncio.to_thread(app.state.category_executor.shutdown, wait=True)
+        await asyncio.to_thread(app.state.driver_pool.close)
+        app.state.curl_session.close()
+
 app = FastAPI(
     title=API_TITLE,
     description=API_DESCRIPTION,
-    version=API_VERSION
+    version=API_VERSION,
+    lifespan=lifespan,
+    default_response_class=OrjsonResponse
 )
 
 app.include_router(scrape_router, prefix="/api/v1") # Added a prefix for versioning
@@ -23,5 +56,13 @@ async def read_root():
 
 
 if __name__ == "__main__":
+    import sys
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    # uvloop + httptools (both from uvicorn[standard]) cut per-task dispatch overhead for the scrape fan-out.
+    # uvloop has no Windows build, so fall back to the stock asyncio loop there.
+    if sys.platform == "win32":
+        logging.getLogger(__name__).info("uvloop is unavailable on Windows; running on the default asyncio event loop.")
+        event_loop = "asyncio"
+    else:
+        event_loop = "uvloop"
+    uvicorn.run(app, host="0.0.0.0", port=8000, loop=event_loop, http="httptools")
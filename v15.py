@@ -4,12 +4,16 @@ import re
 import time
 import random
 import asyncio
+import heapq
 from typing import List, Dict, Optional, Any, Tuple
 from datetime import datetime
 from urllib.parse import urlparse, urljoin
-from concurrent.futures import ThreadPoolExecutor, as_completed
 import traceback
 import sys
+import threading
+import queue
+from contextlib import asynccontextmanager
+from functools import lru_cache
 
 # --- Pydantic Models ---
 from pydantic import BaseModel, Field, HttpUrl, ValidationError
@@ -33,31 +37,52 @@ class ScrapeRequest(BaseModel):
 
 # --- FastAPI ---
 from fastapi import FastAPI, HTTPException, Body
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Pre-warm the driver pool so the first requests don't pay Chrome's cold start; a failed launch just leaves a slot empty.
+    loop = asyncio.get_running_loop()
+    warmed_drivers = await asyncio.gather(
+        *(loop.run_in_executor(None, setup_selenium_driver) for _ in range(DRIVER_POOL_SIZE)), return_exceptions=True
+    )
+    for warmed_driver in warmed_drivers:
+        if isinstance(warmed_driver, Exception): print(f"  [Driver Pool] Pre-warm launch failed: {warmed_driver}")
+        else: release_driver(warmed_driver, count_use=False)
+    try:
+        yield
+    finally:
+        await loop.run_in_executor(None, quit_pooled_drivers)
+
 app = FastAPI(
     title="Comparably Scraper API - Hybrid Optimized (Unlimited Pages)",
     description="Optimized Hybrid: Selenium (pre-click overlay wait), Curl-CFFI Q-Rev. No page limits.",
-    version="2.3.6" # Incremented version
+    version="2.3.6", # Incremented version
+    lifespan=lifespan
 )
 
-from bs4 import BeautifulSoup
+from lxml import etree
+from lxml import html as lxml_html
+from lxml.cssselect import CSSSelector
 from selenium import webdriver
-from selenium.common.exceptions import (
-    TimeoutException, NoSuchElementException, ElementClickInterceptedException,
-    StaleElementReferenceException, ElementNotInteractableException
-)
+from selenium.common.exceptions import TimeoutException, WebDriverException
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from webdriver_manager.chrome import ChromeDriverManager
 
-from curl_cffi.requests import Session as CurlCffiSession, RequestsError
+from curl_cffi.requests import AsyncSession as CurlCffiAsyncSession, RequestsError
 
 try: from fake_useragent import UserAgent; ua = UserAgent()
 except ImportError: print("Warning: fake-useragent not installed."); ua = None
 
-try: import lxml; DEFAULT_HTML_PARSER = "lxml"; print("INFO: Using lxml for HTML parsing.")
-except ImportError: print("Warning: lxml not installed, using html.parser."); DEFAULT_HTML_PARSER = "html.parser"
+try:
+    import xxhash
+    def _text_hash(text: str) -> int:
+        return xxhash.xxh3_64_intdigest(text.encode('utf-8'))
+except ImportError:
+    print("Warning: xxhash not installed. Falling back to built-in hash for review dedup."); _text_hash = hash
+
 
 # --- Constants ---
 REVIEW_CATEGORIES = ["leadership", "compensation", "team", "environment", "outlook","interviews"]
@@ -65,9 +90,9 @@ REVIEW_CATEGORIES = ["leadership", "compensation", "team", "environment", "outlo
 # MAX_REVIEW_PAGES_PER_QUESTION REMOVED
 SELENIUM_PAGE_TIMEOUT_S = 20
 SELENIUM_ELEMENT_TIMEOUT_S = 12
-SELENIUM_INTERACTION_TIMEOUT_S = 6
 CURL_REQUEST_TIMEOUT_S = 15
 CURL_IMPERSONATE_BROWSER = "chrome110"
+CURL_MAX_CLIENTS_PER_CATEGORY = 10
 
 NEXT_PAGE_SELECTORS = [
     "a.qa-PaginationPageLink-Next", "a.pagination-link[rel='next']",
@@ -78,6 +103,34 @@ NEXT_PAGE_SELECTORS = [
 ]
 REVIEW_BLOCK_CSS_SELECTOR_BS = "div.cppRH"
 QUESTION_BLOCK_SELECTOR_BS = "div.reviewsList"
+_REVIEW_BLOCK_CLASS = REVIEW_BLOCK_CSS_SELECTOR_BS.split('.')[-1]
+_QUESTION_BLOCK_CLASS = QUESTION_BLOCK_SELECTOR_BS.split('.')[-1]
+
+def _class_xpath(tag: str, class_name: str, axis: str = ".//") -> etree.XPath:
+    # Whole-token class match, like bs4's class_= (so 'cppRH' does not match 'cppRH-review-quote')
+    return etree.XPath(f"{axis}{tag}[contains(concat(' ', normalize-space(@class), ' '), ' {class_name} ')]")
+
+_REVIEW_BLOCKS_XPATH = _class_xpath('div', _REVIEW_BLOCK_CLASS)
+_QUESTION_BLOCKS_XPATH = _class_xpath('div', _QUESTION_BLOCK_CLASS)
+_IN_QUESTION_BLOCK_XPATH = _class_xpath('div', _QUESTION_BLOCK_CLASS, axis="ancestor::")
+_QUESTION_TITLE_XPATH = _class_xpath('h2', 'section-subtitle')
+_REVIEW_QUOTE_XPATH = _class_xpath('p', 'cppRH-review-quote')
+_REVIEW_DATE_XPATH = etree.XPath(_class_xpath('cite', 'cppRH-review-cite').path + "//meta[@itemprop='datePublished']/@content")
+_REVIEW_CITE_META_CONTENT_XPATH = etree.XPath(_class_xpath('cite', 'cppRH-review-cite').path + "//meta/@content")
+# Translated to XPath once here; .cssselect() would redo that on every call. Kept as a tuple to preserve priority order.
+_NEXT_PAGE_CSS = tuple(CSSSelector(sel) for sel in NEXT_PAGE_SELECTORS)
+# Pagination containers, matched case-insensitively by libxml2; results come back in document order.
+_Q_PAGINATION_SCOPE_CSS = CSSSelector(", ".join(
+    f"{tag}[class*='{marker}' i]" for tag in ('nav', 'ul', 'div') for marker in ('pagination', 'pager', 'page-links')
+))
+_CAT_PAGINATION_NAV_CSS = CSSSelector("nav[aria-label*='pagination' i]")
+_CAT_PAGINATION_UL_CSS = CSSSelector("ul[class*='pagination' i]")
+_DATE_META_RE = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+_SECTION_URL_RE = re.compile(r'/reviews/(\w+)')
+
+def element_text(elem) -> str:
+    # lxml counterpart of BeautifulSoup's get_text(strip=True)
+    return "".join(t.strip() for t in elem.itertext())
 
 TARGETED_POPUP_MAIN_SELECTOR = "div[class*='cultureQuestions-popup'] a.closeButton, div[class*='cultureQuestionsLoader'] a.closeButton"
 POPUP_CLOSE_SELECTORS = [
@@ -87,150 +140,210 @@ POPUP_CLOSE_SELECTORS = [
     "svg[data-testid*='close' i]", "i[class*='icon-close' i]",
     "button[class*='close' i]", "span[class*='close' i]"
 ]
-INITIAL_PAGE_LOAD_SLEEP_S = random.uniform(0.8, 1.2)
-AFTER_CATEGORY_CLICK_SLEEP_S = random.uniform(1.0, 1.5)
 CURL_FETCH_DELAY_S = random.uniform(0.3, 0.6)
 
 # --- Helper: Extract Section Name ---
+@lru_cache(maxsize=256) # Section links repeat on every page of a category
 def extract_section_name_from_url(href: Optional[str]) -> str:
     if not href: return "unknown_section"
     try:
         path_parts = urlparse(href).path.strip('/').split('/')
         if len(path_parts) >= 4 and path_parts[2] == 'reviews': return path_parts[3]
     except Exception: pass
-    match = re.search(r'/reviews/(\w+)', href)
+    match = _SECTION_URL_RE.search(href)
     return match.group(1) if match else "unknown_section"
 
+def _review_date_key(review: Review) -> datetime:
+    return review.date
+
 # --- _parse_reviews_from_block (Used by Curl-CFFI part) ---
+def _parse_review_block(
+    block: etree._Element,
+    start_date_filter: Optional[datetime],
+    end_date_filter: Optional[datetime]
+) -> Tuple[Optional[Review], bool]:
+    # Returns (review or None, block is older than start_date_filter)
+    date_strs = _REVIEW_DATE_XPATH(block) or \
+                [c for c in _REVIEW_CITE_META_CONTENT_XPATH(block) if _DATE_META_RE.match(c)]
+    if not date_strs or not date_strs[0]: return None, False
+    try: date_val = datetime.fromisoformat(date_strs[0])
+    except ValueError: return None, False
+    if start_date_filter and date_val < start_date_filter: return None, True
+    if end_date_filter and date_val > end_date_filter: return None, False
+    quotes = _REVIEW_QUOTE_XPATH(block)
+    if not quotes: return None, False
+    text = element_text(quotes[0]).replace('\u0000', '')
+    # Already a str and a datetime, so skip pydantic validation on the per-review hot path
+    return Review.model_construct(text=text, date=date_val), False
+
 def _parse_reviews_from_block(
-    review_container_soup: BeautifulSoup,
+    review_container: etree._Element,
     start_date_filter: Optional[datetime],
     end_date_filter: Optional[datetime]
-) -> List[Review]:
+) -> Tuple[List[Review], bool]:
+    # Reviews are listed newest-first, so the first one older than start_date_filter ends the scan.
+    # The flag tells the caller that later pages of this question can only be older still.
+    reviews_found: List[Review] = []
+    for block in _REVIEW_BLOCKS_XPATH(review_container):
+        review, reached_start_date = _parse_review_block(block, start_date_filter, end_date_filter)
+        if reached_start_date: return reviews_found, True
+        if review is not None: reviews_found.append(review)
+    return reviews_found, False
+
+async def _stream_parse_review_page(
+    response, start_date_filter: Optional[datetime], end_date_filter: Optional[datetime]
+) -> Tuple[List[Review], bool, int, etree._Element]:
+    # Parses a streamed Q-review page as its bytes arrive. Each review block is read and cleared as soon as it closes,
+    # so the returned tree only holds the page skeleton. Returns (reviews, reached start date, review blocks seen, tree).
+    parser = etree.HTMLPullParser(events=("end",), tag="div")
     reviews_found: List[Review] = []
-    review_blocks = review_container_soup.find_all('div', class_=REVIEW_BLOCK_CSS_SELECTOR_BS.split('.')[-1], recursive=True)
-    for block_idx, block in enumerate(review_blocks):
-        quote = block.find('p', class_='cppRH-review-quote')
-        if not quote: continue
-        text = quote.get_text(strip=True).replace('\u0000', '')
-        cite_block = block.find('cite', class_='cppRH-review-cite')
-        date_meta_tag = None
-        if cite_block:
-            date_meta_tag = cite_block.find('meta', {'itemprop': 'datePublished'}) or \
-                         cite_block.find('meta', attrs={'content': re.compile(r'^\d{4}-\d{2}-\d{2}$')})
-        if not date_meta_tag or not date_meta_tag.get('content'): continue
-        try: date_val = datetime.strptime(date_meta_tag['content'], '%Y-%m-%d')
-        except ValueError: continue
-        if start_date_filter and date_val < start_date_filter: continue
-        if end_date_filter and date_val > end_date_filter: continue
-        reviews_found.append(Review(text=text, date=date_val))
-    return reviews_found
+    reached_start_date = False
+    review_block_count = 0
+    async for chunk in response.aiter_content():
+        parser.feed(chunk)
+        for _, elem in parser.read_events():
+            if _REVIEW_BLOCK_CLASS not in (elem.get('class') or '').split(): continue
+            review_block_count += 1
+            if not reached_start_date:
+                review, reached_start_date = _parse_review_block(elem, start_date_filter, end_date_filter)
+                if review is not None: reviews_found.append(review)
+            elem.clear()
+    return reviews_found, reached_start_date, review_block_count, parser.close()
 
 # --- Selenium Setup ---
-def setup_selenium_driver() -> webdriver.Chrome:
-    
-    # proxy  = "107.172.163.27:6543:penuxlir:wa3zqxi9gila"
-    
-  
+# Same for every driver; only the user-agent varies per launch.
+_CHROME_ARGUMENTS = (
+    # "--headless",
+    "--no-sandbox", "--disable-dev-shm-usage",
+    # "--proxy-server=...",
+    "--disable-gpu", "--blink-settings=imagesEnabled=false",
+    "--disable-blink-features=AutomationControlled",
+    "--disable-extensions", "window-size=1920,1080",
+    "--log-level=3",
+)
+_CHROME_EXPERIMENTAL_OPTIONS = (
+    ("excludeSwitches", ["enable-automation", "enable-logging"]),
+    ("useAutomationExtension", False),
+)
+# Sub-resources the review DOM never needs; blocked at the network layer so driver.get() doesn't wait on them.
+_BLOCKED_RESOURCE_URL_PATTERNS = (
+    "*.css", "*.woff*", "*.ttf", "*.otf", "*.mp4", "*.webm",
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico",
+    "*google-analytics*", "*googletagmanager*", "*doubleclick*", "*hotjar*", "*segment.io*", "*facebook.net*",
+)
+# Resolved once per process; ChromeDriverManager().install() checks versions on disk (or the network) on every call.
+_CHROMEDRIVER_PATH: Optional[str] = None
+_chromedriver_path_lock = threading.Lock()
+
+def _chromedriver_path() -> str:
+    global _CHROMEDRIVER_PATH
+    with _chromedriver_path_lock:
+        if _CHROMEDRIVER_PATH is None:
+            _CHROMEDRIVER_PATH = ChromeDriverManager().install()
+        return _CHROMEDRIVER_PATH
+
+def _build_chrome_options() -> webdriver.ChromeOptions:
+    # ChromeOptions objects are mutable, so each driver gets a fresh one built from the shared argument lists.
     options = webdriver.ChromeOptions()
-    # options.add_argument("--headless")
-    options.add_argument("--no-sandbox"); options.add_argument("--disable-dev-shm-usage")
-    # options.add_argument(f"--proxy-server={proxy}")
-    options.add_argument("--disable-gpu"); options.add_argument("--blink-settings=imagesEnabled=false")
-    
-    #addings
-    options.add_experimental_option("excludeSwitches", ["enable-automation"]) 
-    options.add_experimental_option("useAutomationExtension", False)
-    options.add_argument("--disable-blink-features=AutomationControlled") 
-
-    options.add_argument("--disable-extensions"); options.add_argument("window-size=1920,1080")
+    for argument in _CHROME_ARGUMENTS:
+        options.add_argument(argument)
+    for option_name, option_value in _CHROME_EXPERIMENTAL_OPTIONS:
+        options.add_experimental_option(option_name, option_value)
     user_agent_str = ua.random if ua else "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
     options.add_argument(f'user-agent={user_agent_str}')
-    options.add_experimental_option("excludeSwitches", ["enable-automation", "enable-logging"])
-    options.add_experimental_option('useAutomationExtension', False)
-    options.add_argument('--log-level=3')
+    return options
+
+def setup_selenium_driver() -> webdriver.Chrome:
+    options = _build_chrome_options()
     try:
-        service = Service(ChromeDriverManager().install())
+        service = Service(_chromedriver_path())
         driver = webdriver.Chrome(service=service, options=options)
         driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": list(_BLOCKED_RESOURCE_URL_PATTERNS)})
         driver.set_page_load_timeout(SELENIUM_PAGE_TIMEOUT_S)
         return driver
     except Exception as e: print(f"  [Selenium Setup] CRITICAL ERROR: {e}"); traceback.print_exc(); raise RuntimeError(f"Failed: {e}")
 
-# --- try_click ---
-def try_click(driver: webdriver.Chrome, element, timeout: int = SELENIUM_INTERACTION_TIMEOUT_S):
+# --- Driver Pool ---
+# Warm Chromes shared across requests; each company scrape leases one. LIFO hands out the most recently used first.
+DRIVER_POOL_SIZE = 4
+DRIVER_MAX_USES = 50 # Recycle after this many company scrapes to cap Chrome's memory growth
+COMPARABLY_ORIGIN = "https://www.comparably.com"
+_DRIVER_POOL: "queue.LifoQueue[webdriver.Chrome]" = queue.LifoQueue(maxsize=DRIVER_POOL_SIZE)
+_driver_use_counts: Dict[str, int] = {} # session_id -> completed scrapes, for drivers currently in the pool
+# Bounds leased drivers to the pool size, so release_driver always has room to return them
+_driver_lease_semaphore = asyncio.Semaphore(DRIVER_POOL_SIZE)
+
+def acquire_driver() -> webdriver.Chrome:
+    # Callers hold _driver_lease_semaphore; a launch here only replaces a recycled, dead or never-warmed slot.
     try:
-        WebDriverWait(driver, timeout).until(EC.element_to_be_clickable(element))
-        driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center', inline: 'nearest'});", element)
-        time.sleep(0.2 + random.uniform(0.1, 0.2))
-        element.click()
-        return True
-    except ElementClickInterceptedException:
-        print(f"    [try_click] Intercepted. Trying JS click.")
-        try: driver.execute_script("arguments[0].click();", element); return True
-        except Exception as e_js: print(f"    [try_click] JS click failed: {e_js}"); return False
-    except (TimeoutException, ElementNotInteractableException, StaleElementReferenceException) as e_click:
-        print(f"    [try_click] Click failed: {type(e_click).__name__} - {str(e_click).splitlines()[0] if str(e_click) else ''}")
-        return False
-    except Exception as e_other_click: print(f"    [try_click] Unexpected click error: {type(e_other_click).__name__} - {e_other_click}"); return False
-
-# --- attempt_to_close_popups (Polished targeted wait) ---
+        return _DRIVER_POOL.get_nowait()
+    except queue.Empty:
+        return setup_selenium_driver()
+
+def release_driver(driver: webdriver.Chrome, count_use: bool = True) -> None:
+    # Back to a single blank tab with no Comparably state, or quit if it is worn out, dead or the pool is full.
+    session_id = driver.session_id
+    uses = _driver_use_counts.pop(session_id, 0) + (1 if count_use else 0)
+    if session_id is not None and uses < DRIVER_MAX_USES:
+        try:
+            handles = driver.window_handles
+            for extra_handle in handles[1:]:
+                driver.switch_to.window(extra_handle)
+                driver.close()
+            driver.switch_to.window(handles[0])
+            driver.get("about:blank")
+            driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+            driver.execute_cdp_cmd("Storage.clearDataForOrigin", {"origin": COMPARABLY_ORIGIN, "storageTypes": "all"})
+            _driver_use_counts[session_id] = uses
+            _DRIVER_POOL.put_nowait(driver)
+            return
+        except (WebDriverException, queue.Full) as e_release:
+            _driver_use_counts.pop(session_id, None)
+            if isinstance(e_release, WebDriverException):
+                print(f"  [Driver Pool] Driver unusable after scrape ({type(e_release).__name__}); discarding it.")
+    try: driver.quit()
+    except Exception: pass
+
+def quit_pooled_drivers() -> None:
+    while True:
+        try:
+            driver = _DRIVER_POOL.get_nowait()
+        except queue.Empty:
+            break
+        _driver_use_counts.pop(driver.session_id, None)
+        try: driver.quit()
+        except Exception as e_quit: print(f"  [Driver Pool] Error quitting pooled driver: {e_quit}")
+
+# --- attempt_to_close_popups (single in-page probe) ---
+# Clicks the first visible, enabled close button in selector order (targeted popup first) and returns its selector.
+# One execute_script round-trip instead of find_elements + is_displayed/is_enabled per candidate.
+_CLICK_FIRST_VISIBLE_POPUP_CLOSE_JS = """
+var selectors = arguments[0];
+for (var i = 0; i < selectors.length; i++) {
+    var candidates = document.querySelectorAll(selectors[i]);
+    for (var j = 0; j < candidates.length; j++) {
+        var el = candidates[j], rect = el.getBoundingClientRect();
+        if (rect.width > 0 && rect.height > 0 && !el.disabled) { el.click(); return selectors[i]; }
+    }
+}
+return null;
+"""
+
 def attempt_to_close_popups(driver: webdriver.Chrome, thread_name: str):
-    closed_any = False
     main_window = driver.current_window_handle
     initial_handles = set(driver.window_handles)
-    popup_interaction_wait = WebDriverWait(driver, 2, poll_frequency=0.2)
 
-    targeted_popup_buttons_found_and_visible = False
     try:
-        targeted_popup_buttons = driver.find_elements(By.CSS_SELECTOR, TARGETED_POPUP_MAIN_SELECTOR)
-        for btn in targeted_popup_buttons:
-            if btn.is_displayed() and btn.is_enabled():
-                targeted_popup_buttons_found_and_visible = True
-                print(f"      [{thread_name}] Attempting to close TARGETED popup...")
-                try:
-                    driver.execute_script("arguments[0].click();", btn)
-                    popup_interaction_wait.until(EC.staleness_of(btn))
-                    print(f"      [{thread_name}] Targeted popup seems closed (became stale).")
-                    closed_any = True; break
-                except TimeoutException:
-                    if not btn.is_displayed():
-                        print(f"      [{thread_name}] Targeted popup seems closed (not displayed after timeout).")
-                        closed_any = True; break
-                    else: print(f"      [{thread_name}] Targeted popup still visible after click attempt and wait.")
-                except StaleElementReferenceException: print(f"      [{thread_name}] Targeted popup closed (already stale)."); closed_any = True; break
-                except Exception as e_close_target: print(f"      [{thread_name}] Error clicking targeted popup: {e_close_target}")
-        if closed_any:
-            time.sleep(0.5 + random.uniform(0.1, 0.2))
-    except Exception:
-        pass
-
-    run_generic_check = True
-    if targeted_popup_buttons_found_and_visible and closed_any:
-        try:
-            if not driver.find_elements(By.CSS_SELECTOR, TARGETED_POPUP_MAIN_SELECTOR) or \
-               not any(b.is_displayed() for b in driver.find_elements(By.CSS_SELECTOR, TARGETED_POPUP_MAIN_SELECTOR)):
-                run_generic_check = False
-        except:
-            run_generic_check = False
-
-    if run_generic_check:
-        for sel_idx, sel in enumerate(POPUP_CLOSE_SELECTORS):
-            if sel == TARGETED_POPUP_MAIN_SELECTOR : continue
-            try:
-                popups = driver.find_elements(By.CSS_SELECTOR, sel)
-                if not popups: continue
-                for popup_btn in popups:
-                    if popup_btn.is_displayed() and popup_btn.is_enabled():
-                        print(f"      [{thread_name}] Attempting generic popup close ({sel_idx+1}/{len(POPUP_CLOSE_SELECTORS)}) with: {sel[:30]}...")
-                        try:
-                            driver.execute_script("arguments[0].click();", popup_btn)
-                            time.sleep(0.3 + random.uniform(0.1, 0.2))
-                            if not popup_btn.is_displayed(): print(f"      [{thread_name}] Generic popup seems closed."); break
-                        except StaleElementReferenceException: print(f"      [{thread_name}] Generic popup closed (stale)."); break
-                        except Exception as e_close: print(f"      [{thread_name}] Error clicking generic popup close ({sel[:30]}...): {e_close}")
-                if popups and not popups[0].is_displayed(): break
-            except Exception: pass
+        clicked_selector = driver.execute_script(_CLICK_FIRST_VISIBLE_POPUP_CLOSE_JS, POPUP_CLOSE_SELECTORS)
+    except Exception as e_close:
+        print(f"      [{thread_name}] Error probing popup close buttons: {e_close}")
+        clicked_selector = None
+    if clicked_selector:
+        popup_kind = "targeted" if clicked_selector == TARGETED_POPUP_MAIN_SELECTOR else "generic"
+        print(f"      [{thread_name}] Clicked {popup_kind} popup close with: {clicked_selector[:30]}...")
+        time.sleep(0.5 + random.uniform(0.1, 0.2))
 
     final_handles = set(driver.window_handles)
     new_handles = final_handles - initial_handles
@@ -243,263 +356,268 @@ def attempt_to_close_popups(driver: webdriver.Chrome, thread_name: str):
                 except Exception as e_win_close: print(f"      [{thread_name}] Error closing new window: {e_win_close}")
         driver.switch_to.window(main_window)
 
-    if closed_any and run_generic_check :
-        print(f"      [{thread_name}] Generic popup/window closure attempted. Pausing briefly...")
-        time.sleep(0.4 + random.uniform(0.1, 0.2))
+# --- Category page loading ---
+def _read_site_cookies(driver: webdriver.Chrome, page_url: str) -> Dict[str, str]:
+    # CDP scopes the result to cookies the browser would send to page_url, so third-party trackers never cross the wire.
+    try:
+        cookies = driver.execute_cdp_cmd("Network.getCookies", {"urls": [page_url]})["cookies"]
+    except Exception:
+        cookies = driver.get_cookies()
+    return {c['name']: c['value'] for c in cookies}
+
+def _load_category_page_in_browser(
+    driver: webdriver.Chrome, page_url: str, thread_name: str,
+    browser_cookies: Dict[str, str], refresh_cookies: bool = False
+) -> Optional[Tuple[str, str, Dict[str, str]]]:
+    # Caller holds the shared driver's lock. Returns (html, final url, cookies), or None if no review content appeared.
+    # browser_cookies is the company's cookie cache: it is only read from the browser on the first load or when asked to refresh.
+    driver.get(page_url)
+    try:
+        WebDriverWait(driver, SELENIUM_ELEMENT_TIMEOUT_S).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, f"{QUESTION_BLOCK_SELECTOR_BS}, {REVIEW_BLOCK_CSS_SELECTOR_BS}"))
+        )
+    except TimeoutException:
+        return None
+    attempt_to_close_popups(driver, thread_name)
+    final_url = driver.current_url
+    if refresh_cookies or not browser_cookies:
+        browser_cookies.update(_read_site_cookies(driver, final_url))
+    return driver.page_source, final_url, browser_cookies
+
+async def _fetch_category_page_with_curl(
+    curl_session: CurlCffiAsyncSession, page_url: str, headers: Dict[str, str], thread_name: str
+) -> Optional[Tuple[str, str, Dict[str, str]]]:
+    # Same shape as _load_category_page_in_browser; None means an error or challenge page that needs the browser.
+    try:
+        response = await curl_session.get(page_url, headers=headers, timeout=CURL_REQUEST_TIMEOUT_S, allow_redirects=True)
+    except RequestsError as e_cat_req:
+        print(f"    [{thread_name}] Curl-CFFI Error fetching Cat page {page_url}: {e_cat_req}")
+        return None
+    if response.status_code != 200 or "challenge-platform" in response.text:
+        return None
+    return response.text, str(response.url), {} # The session's own jar keeps any cookies the response set
+
+async def _load_category_page_in_browser_async(
+    shared_driver: webdriver.Chrome, shared_driver_lock: asyncio.Lock, browser_cookies: Dict[str, str],
+    page_url: str, thread_name: str, refresh_cookies: bool = False
+) -> Optional[Tuple[str, str, Dict[str, str]]]:
+    # Selenium blocks, so the browser load runs on a worker thread while the other categories keep fetching.
+    # The lock also guards browser_cookies, which only the worker thread writes.
+    async with shared_driver_lock:
+        return await asyncio.get_running_loop().run_in_executor(
+            None, _load_category_page_in_browser, shared_driver, page_url, thread_name, browser_cookies, refresh_cookies
+        )
+
+# --- Q-review pagination (one coroutine per question) ---
+async def _paginate_question_reviews(
+    thread_name: str, question_text: str, q_block: etree._Element, category_page_url: str,
+    curl_session: CurlCffiAsyncSession, base_curl_headers: Dict[str, str],
+    start_date_filter: Optional[datetime], end_date_filter: Optional[datetime]
+) -> List[Tuple[List[Review], str]]:
+    # Returns (parsed reviews, source url) for each of the question's review pages, page 1 (the category page) first.
+    # De-duplication happens afterwards in question order, so questions can paginate concurrently.
+    pages: List[Tuple[List[Review], str]] = []
+    current_q_reviews_html_segment = q_block
+    current_q_reviews_source_url_for_curl = category_page_url
+    reviews_on_page, reached_start_date = _parse_reviews_from_block(q_block, start_date_filter, end_date_filter)
+    while True:
+        pages.append((reviews_on_page, current_q_reviews_source_url_for_curl))
+        if reached_start_date:
+            print(f"        [{thread_name}] Q-Review Nav: reached reviews older than the start date for Q '{question_text[:30]}...'. Stopping Q pagination.")
+            break
+
+        next_q_review_page_href = None
+        pagination_scopes_for_q = _Q_PAGINATION_SCOPE_CSS(current_q_reviews_html_segment)
+        pagination_scope_for_q = pagination_scopes_for_q[0] if pagination_scopes_for_q else current_q_reviews_html_segment
+
+        for next_page_css in _NEXT_PAGE_CSS:
+            buttons = next_page_css(pagination_scope_for_q)
+            for btn_tag in buttons:
+                href = btn_tag.get('href')
+                aria_label = (btn_tag.get("aria-label") or "").lower()
+                rel_str = (btn_tag.get("rel") or "").lower()
+                btn_text = element_text(btn_tag).lower()
+                combined = f"{aria_label} {rel_str} {btn_text}"
+                is_prev = "prev" in combined or "previous" in combined
+                class_list = (btn_tag.get('class') or '').split()
+                is_disabled = any(c in class_list for c in ['disabled', 'inactive']) or btn_tag.get('disabled') is not None
+
+                if is_prev or is_disabled: continue
+                if href and href != "#" and not href.startswith("javascript:"):
+                    next_q_review_page_href = urljoin(current_q_reviews_source_url_for_curl, href)
+                    break
+            if next_q_review_page_href: break
+
+        if not next_q_review_page_href:
+            break
+
+        try:
+            await asyncio.sleep(CURL_FETCH_DELAY_S)
+            q_review_fetch_headers = base_curl_headers.copy()
+            q_review_fetch_headers['Referer'] = current_q_reviews_source_url_for_curl
+            response_q_review_page = await curl_session.get(next_q_review_page_href, headers=q_review_fetch_headers, timeout=CURL_REQUEST_TIMEOUT_S, allow_redirects=True, stream=True)
+            try:
+                response_q_review_page.raise_for_status()
+                reviews_on_page, reached_start_date, review_block_count, current_q_reviews_html_segment = await _stream_parse_review_page(
+                    response_q_review_page, start_date_filter, end_date_filter
+                )
+            finally:
+                await response_q_review_page.aclose()
+            current_q_reviews_source_url_for_curl = str(response_q_review_page.url)
+
+            if not review_block_count:
+                print(f"        [{thread_name}] Q-Review Nav CRITICAL: Fetched page {current_q_reviews_source_url_for_curl} has NO review blocks. Stopping for this question.")
+                break
+
+            if len(_QUESTION_BLOCKS_XPATH(current_q_reviews_html_segment)) > 1:
+                print(f"        [{thread_name}] Q-Review Nav WARNING: Curl-fetched page {current_q_reviews_source_url_for_curl} looks like a full category page (multiple Q-blocks). Stopping Q pagination.")
+                break
+
+            q_elems_on_new_page = _QUESTION_TITLE_XPATH(current_q_reviews_html_segment)
+            new_page_question_text = element_text(q_elems_on_new_page[0]) if q_elems_on_new_page else None
+            if q_elems_on_new_page and new_page_question_text and new_page_question_text != question_text:
+                print(f"        [{thread_name}] Q-Review Nav WARNING: Fetched page {current_q_reviews_source_url_for_curl} has different Q title ('{new_page_question_text[:30]}...') than current ('{question_text[:30]}...'). Stopping Q pagination.")
+                break
+
+        except RequestsError as e_q_rev_req:
+            status_code_msg = f" (Status: {e_q_rev_req.response.status_code})" if hasattr(e_q_rev_req, 'response') and e_q_rev_req.response else ""
+            print(f"        [{thread_name}] Curl-CFFI Error{status_code_msg} fetching Q-REVIEW page {next_q_review_page_href}: {e_q_rev_req}")
+            break
+        except Exception as e_gen_curl:
+            print(f"        [{thread_name}] Generic Error during Curl Q-REVIEW fetch/parse from {next_q_review_page_href}: {e_gen_curl}")
+            traceback.print_exc(file=sys.stdout)
+            break
+    return pages
 
 # --- HYBRID Scraper ---
-def _scrape_category_deep_reviews_hybrid(
+async def _scrape_category_deep_reviews_hybrid(
     company_base_url_str: str, category_name_arg: str, company_slug: str,
+    shared_driver: webdriver.Chrome, shared_driver_lock: asyncio.Lock, browser_cookies: Dict[str, str],
+    curl_session: CurlCffiAsyncSession, user_agent_hdr: str,
     start_date_filter: Optional[datetime] = None, end_date_filter: Optional[datetime] = None
 ) -> Tuple[str, List[Question]]:
     thread_name = f"Hybrid-{category_name_arg}-{company_slug[:10]}"
     category_scrape_start_time = time.perf_counter()
     print(f"  [{thread_name}] Started for category: {category_name_arg}")
     collected_questions_for_this_category: List[Question] = []
+    questions_by_text: Dict[str, Question] = {} # Same Question objects as the list, for O(1) lookup on later pages
     processed_reviews_keys_globally_for_category = set()
-    category_driver = None
     total_reviews_in_category_count = 0
 
     try:
-        category_driver = setup_selenium_driver()
-        category_wait = WebDriverWait(category_driver, SELENIUM_ELEMENT_TIMEOUT_S)
-
+        # The browser only loads page 1 (overlays, cookies); the company's categories take turns with it.
         category_url_start = urljoin(company_base_url_str.rstrip('/') + "/", f"reviews/{category_name_arg}/")
-        category_driver.get(category_url_start)
-        time.sleep(INITIAL_PAGE_LOAD_SLEEP_S)
-        attempt_to_close_popups(category_driver, thread_name)
-
-        user_agent_hdr = category_driver.execute_script("return navigator.userAgent;")
+        loaded_category_page = await _load_category_page_in_browser_async(shared_driver, shared_driver_lock, browser_cookies, category_url_start, thread_name)
         base_curl_headers = { 'User-Agent': user_agent_hdr, 'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.9', 'Accept-Language': 'en-US,en;q=0.9' }
 
         category_page_count = 0
         while True: # REMOVED: category_page_count < MAX_CATEGORY_PAGES
             category_page_count += 1
-            current_category_page_url = category_driver.current_url
-            print(f"  [{thread_name}] Selenium on Cat Page {category_page_count} for '{category_name_arg}' ({current_category_page_url})")
-
-            try:
-                category_wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, f"{QUESTION_BLOCK_SELECTOR_BS}, {REVIEW_BLOCK_CSS_SELECTOR_BS}")))
-            except TimeoutException:
+            if loaded_category_page is None:
                 print(f"  [{thread_name}] Timeout waiting for content on Cat Page {category_page_count}.")
                 if category_page_count == 1: print(f"  [{thread_name}] Initial page for '{category_name_arg}' seems empty or failed to load content.")
                 break # Stop if content doesn't load
+            category_page_source, current_category_page_url, current_selenium_cookies = loaded_category_page
+            curl_session.cookies.update(current_selenium_cookies)
+            print(f"  [{thread_name}] On Cat Page {category_page_count} for '{category_name_arg}' ({current_category_page_url})")
 
-            current_selenium_cookies = {c['name']: c['value'] for c in category_driver.get_cookies()}
-            time.sleep(0.5)
-            page_source_for_bs = category_driver.page_source
-            soup_current_category_page = BeautifulSoup(page_source_for_bs, DEFAULT_HTML_PARSER)
-            question_blocks_on_cat_page = soup_current_category_page.find_all('div', class_=QUESTION_BLOCK_SELECTOR_BS.split('.')[-1])
+            current_category_page_tree = lxml_html.fromstring(category_page_source)
+            question_blocks_on_cat_page = _QUESTION_BLOCKS_XPATH(current_category_page_tree)
 
             if not question_blocks_on_cat_page:
-                 if category_page_count == 1 and not soup_current_category_page.find('div', class_=REVIEW_BLOCK_CSS_SELECTOR_BS.split('.')[-1]):
-                      print(f"  [{thread_name}] No question/review blocks on initial Cat Page {category_page_count}. Source length: {len(page_source_for_bs)}")
+                 if category_page_count == 1 and not _REVIEW_BLOCKS_XPATH(current_category_page_tree):
+                      print(f"  [{thread_name}] No question/review blocks on initial Cat Page {category_page_count}. Source length: {len(category_page_source)}")
                  elif category_page_count > 1:
                       print(f"  [{thread_name}] No question blocks on Cat Page {category_page_count}, likely end of category pages.")
-                 if category_page_count > 1 or not soup_current_category_page.find('div', class_=REVIEW_BLOCK_CSS_SELECTOR_BS.split('.')[-1]):
+                 if category_page_count > 1 or not _REVIEW_BLOCKS_XPATH(current_category_page_tree):
                      break
 
-            for q_block_idx, q_block_soup in enumerate(question_blocks_on_cat_page):
-                q_elem = q_block_soup.find('h2', class_='section-subtitle')
-                if not q_elem: continue
-                question_text = q_elem.get_text(strip=True)
-
+            # Every question on the page paginates at once over the shared session
+            question_texts_on_cat_page: List[str] = []
+            q_pagination_coros = []
+            for q_block in question_blocks_on_cat_page:
+                q_elems = _QUESTION_TITLE_XPATH(q_block)
+                if not q_elems: continue
+                question_text = element_text(q_elems[0])
+                question_texts_on_cat_page.append(question_text)
+                q_pagination_coros.append(_paginate_question_reviews(
+                    thread_name, question_text, q_block, current_category_page_url,
+                    curl_session, base_curl_headers, start_date_filter, end_date_filter
+                ))
+            q_review_pages_per_question = await asyncio.gather(*q_pagination_coros)
+
+            for question_text, q_review_pages in zip(question_texts_on_cat_page, q_review_pages_per_question):
                 all_reviews_for_this_q_session: List[Review] = []
-                current_q_reviews_html_segment_bs = q_block_soup
-                current_q_reviews_source_url_for_curl = current_category_page_url
-
-                with CurlCffiSession(impersonate=CURL_IMPERSONATE_BROWSER, trust_env=False) as curl_q_session:
-                    curl_q_session.cookies.update(current_selenium_cookies)
-                    q_review_page_num_curl = 0
-                    while True: 
-                        q_review_page_num_curl += 1
+                question_text_hash = _text_hash(question_text)
+                for q_review_page_num_curl, (reviews_from_current_segment, current_q_reviews_source_url_for_curl) in enumerate(q_review_pages, start=1):
+                    newly_added_this_q_sub_page_count = 0
+                    for r_parsed in reviews_from_current_segment:
+                        r_key = (question_text_hash, _text_hash(r_parsed.text), r_parsed.date)
+                        if r_key not in processed_reviews_keys_globally_for_category:
+                            all_reviews_for_this_q_session.append(r_parsed)
+                            processed_reviews_keys_globally_for_category.add(r_key)
+                            newly_added_this_q_sub_page_count +=1
+                            total_reviews_in_category_count +=1
+
+                    print(f"      [{thread_name}] Q-Review Page {q_review_page_num_curl} (Q: '{question_text[:30]}...'): Parsed {len(reviews_from_current_segment)} items, {newly_added_this_q_sub_page_count} new. Total for this Q now: {len(all_reviews_for_this_q_session)}.")
+
+                    if newly_added_this_q_sub_page_count == 0 and q_review_page_num_curl > 1 and reviews_from_current_segment:
+                         print(f"        [{thread_name}] Note: Found {len(reviews_from_current_segment)} reviews on Q-page {q_review_page_num_curl}, but all were duplicates already seen in this category scan.")
+                    elif not reviews_from_current_segment and q_review_page_num_curl > 1 :
+                         print(f"        [{thread_name}] Warning: Found 0 review items on Q-page {q_review_page_num_curl} (Q: '{question_text[:30]}...'). URL: {current_q_reviews_source_url_for_curl}. May indicate end or issue.")
 
-                        reviews_from_current_segment = _parse_reviews_from_block(
-                            current_q_reviews_html_segment_bs, start_date_filter, end_date_filter
-                        )
-                        newly_added_this_q_sub_page_count = 0
-                        for r_parsed in reviews_from_current_segment:
-                            r_key = (hash(question_text), hash(r_parsed.text), r_parsed.date)
-                            if r_key not in processed_reviews_keys_globally_for_category:
-                                all_reviews_for_this_q_session.append(r_parsed)
-                                processed_reviews_keys_globally_for_category.add(r_key)
-                                newly_added_this_q_sub_page_count +=1
-                                total_reviews_in_category_count +=1
-
-                        print(f"      [{thread_name}] Q-Review Page {q_review_page_num_curl} (Q: '{question_text[:30]}...'): Parsed {len(reviews_from_current_segment)} items, {newly_added_this_q_sub_page_count} new. Total for this Q now: {len(all_reviews_for_this_q_session)}.")
-
-                        if newly_added_this_q_sub_page_count == 0 and q_review_page_num_curl > 1 and reviews_from_current_segment:
-                             print(f"        [{thread_name}] Note: Found {len(reviews_from_current_segment)} reviews on Q-page {q_review_page_num_curl}, but all were duplicates already seen in this category scan.")
-                        elif not reviews_from_current_segment and q_review_page_num_curl > 1 :
-                             print(f"        [{thread_name}] Warning: Found 0 review items on Q-page {q_review_page_num_curl} (Q: '{question_text[:30]}...'). URL: {current_q_reviews_source_url_for_curl}. May indicate end or issue.")
-
-
-                        next_q_review_page_href = None
-                        pagination_scope_for_q_bs = current_q_reviews_html_segment_bs.find(['nav', 'ul', 'div'],
-                            class_=lambda x: x and any(p in x.lower() for p in ['pagination', 'pager', 'page-links', 'qa-Pagination', 'cp-Pagination']),
-                            recursive=True
-                        ) or current_q_reviews_html_segment_bs
-
-                        for sel_idx_q, sel_q in enumerate(NEXT_PAGE_SELECTORS):
-                            buttons_bs = pagination_scope_for_q_bs.select(sel_q)
-                            for btn_tag_bs in buttons_bs:
-                                href = btn_tag_bs.get('href')
-                                aria_label_bs = btn_tag_bs.get("aria-label", "").lower()
-                                rel_val_bs = btn_tag_bs.get("rel"); rel_str_bs = " ".join(rel_val_bs).lower() if isinstance(rel_val_bs, list) else (rel_val_bs or "").lower()
-                                text_bs = btn_tag_bs.get_text(strip=True).lower()
-                                combined_bs = f"{aria_label_bs} {rel_str_bs} {text_bs}"
-                                is_prev_bs = "prev" in combined_bs or "previous" in combined_bs
-                                class_bs_list = btn_tag_bs.get('class', [])
-                                is_disabled_bs = any(c in class_bs_list for c in ['disabled', 'inactive']) or btn_tag_bs.has_attr('disabled')
-
-                                if is_prev_bs or is_disabled_bs: continue
-                                if href and href != "#" and not href.startswith("javascript:"):
-                                    next_q_review_page_href = urljoin(current_q_reviews_source_url_for_curl, href)
-                                    break
-                            if next_q_review_page_href: break
-
-                        if not next_q_review_page_href:
-                            break
-
-                        try:
-                            time.sleep(CURL_FETCH_DELAY_S)
-                            q_review_fetch_headers = base_curl_headers.copy()
-                            q_review_fetch_headers['Referer'] = current_q_reviews_source_url_for_curl
-                            response_q_review_page = curl_q_session.get(next_q_review_page_href, headers=q_review_fetch_headers, timeout=CURL_REQUEST_TIMEOUT_S, allow_redirects=True)
-                            response_q_review_page.raise_for_status()
-                            
-                            current_q_reviews_html_segment_bs = BeautifulSoup(response_q_review_page.text, DEFAULT_HTML_PARSER)
-                            current_q_reviews_source_url_for_curl = str(response_q_review_page.url)
-
-                            if not current_q_reviews_html_segment_bs.find('div', class_=REVIEW_BLOCK_CSS_SELECTOR_BS.split('.')[-1]):
-                                print(f"        [{thread_name}] Q-Review Nav CRITICAL: Fetched page {current_q_reviews_source_url_for_curl} has NO review blocks. Stopping for this question.")
-                                break
-
-                            if len(current_q_reviews_html_segment_bs.find_all('div', class_=QUESTION_BLOCK_SELECTOR_BS.split('.')[-1])) > 1:
-                                print(f"        [{thread_name}] Q-Review Nav WARNING: Curl-fetched page {current_q_reviews_source_url_for_curl} looks like a full category page (multiple Q-blocks). Stopping Q pagination.")
-                                break
-                            
-                            q_elem_on_new_page = current_q_reviews_html_segment_bs.find('h2', class_='section-subtitle')
-                            new_page_question_text = q_elem_on_new_page.get_text(strip=True) if q_elem_on_new_page else None
-                            if q_elem_on_new_page and new_page_question_text and new_page_question_text != question_text:
-                                print(f"        [{thread_name}] Q-Review Nav WARNING: Fetched page {current_q_reviews_source_url_for_curl} has different Q title ('{new_page_question_text[:30]}...') than current ('{question_text[:30]}...'). Stopping Q pagination.")
-                                break
-
-                        except RequestsError as e_q_rev_req:
-                            status_code_msg = f" (Status: {e_q_rev_req.response.status_code})" if hasattr(e_q_rev_req, 'response') and e_q_rev_req.response else ""
-                            print(f"        [{thread_name}] Curl-CFFI Error{status_code_msg} fetching Q-REVIEW page {next_q_review_page_href}: {e_q_rev_req}")
-                            break
-                        except Exception as e_gen_curl:
-                            print(f"        [{thread_name}] Generic Error during Curl Q-REVIEW fetch/parse from {next_q_review_page_href}: {e_gen_curl}")
-                            traceback.print_exc(file=sys.stdout)
-                            break
-                
                 if all_reviews_for_this_q_session:
                     print(f"    [{thread_name}] Finished Q: '{question_text[:60]}...'. Collected {len(all_reviews_for_this_q_session)} reviews for it in this session.")
-                    all_reviews_for_this_q_session.sort(key=lambda r: r.date, reverse=True)
-                    existing_q_obj = next((q for q in collected_questions_for_this_category if q.question_text == question_text), None)
+                    all_reviews_for_this_q_session.sort(key=_review_date_key, reverse=True)
+                    existing_q_obj = questions_by_text.get(question_text)
                     if existing_q_obj:
-                        new_merged_count = 0
-                        for r_new in all_reviews_for_this_q_session:
-                            if not any(er.text == r_new.text and er.date == r_new.date for er in existing_q_obj.review_section.reviews):
-                                existing_q_obj.review_section.reviews.append(r_new); new_merged_count+=1
-                        if new_merged_count > 0:
-                            existing_q_obj.review_section.reviews.sort(key=lambda r: r.date, reverse=True)
+                        # Already unique: processed_reviews_keys_globally_for_category keys on (question, text, date)
+                        # Both lists are already newest-first, so a linear merge keeps the order without re-sorting
+                        existing_q_obj.review_section.reviews[:] = heapq.merge(
+                            existing_q_obj.review_section.reviews, all_reviews_for_this_q_session,
+                            key=_review_date_key, reverse=True
+                        )
                     else:
-                        review_section = ReviewSection(section_name=category_name_arg, reviews=all_reviews_for_this_q_session)
-                        question_obj = Question(question_text=question_text, review_section=review_section)
+                        review_section = ReviewSection.model_construct(section_name=category_name_arg, reviews=all_reviews_for_this_q_session)
+                        question_obj = Question.model_construct(question_text=question_text, review_section=review_section)
                         collected_questions_for_this_category.append(question_obj)
+                        questions_by_text[question_text] = question_obj
 
-            next_category_page_button_sel_elem = None
-            cat_page_nav_scope_bs = soup_current_category_page.find('nav', attrs={'aria-label': lambda x: x and 'pagination' in x.lower()}) or \
-                                 soup_current_category_page.find('ul', class_=lambda x: x and 'pagination' in x.lower()) or \
-                                 soup_current_category_page
+            cat_page_nav_scopes = _CAT_PAGINATION_NAV_CSS(current_category_page_tree) or _CAT_PAGINATION_UL_CSS(current_category_page_tree)
+            cat_page_nav_scope = cat_page_nav_scopes[0] if cat_page_nav_scopes else current_category_page_tree
 
-            href_bs_for_retry = None
-            sel_css_for_retry = None
-
-            for sel_css in NEXT_PAGE_SELECTORS:
-                potential_bs_btns = cat_page_nav_scope_bs.select(sel_css)
-                for btn_s_tag in potential_bs_btns:
-                    if btn_s_tag.find_parent('div', class_=QUESTION_BLOCK_SELECTOR_BS.split('.')[-1]):
+            next_category_page_href = None
+            for next_page_css in _NEXT_PAGE_CSS:
+                for btn_s_tag in next_page_css(cat_page_nav_scope):
+                    if _IN_QUESTION_BLOCK_XPATH(btn_s_tag):
                         continue
 
-                    aria_label_bs = btn_s_tag.get("aria-label", "").lower()
-                    rel_val_bs = btn_s_tag.get("rel"); rel_bs = " ".join(rel_val_bs).lower() if isinstance(rel_val_bs, list) else (rel_val_bs or "").lower()
-                    text_bs = btn_s_tag.get_text(strip=True).lower()
-                    combined_bs = f"{aria_label_bs} {rel_bs} {text_bs}"; is_prev_bs = "prev" in combined_bs or "previous" in combined_bs
-                    class_bs_list = btn_s_tag.get('class', []); is_disabled_bs = any(c in class_bs_list for c in ['disabled', 'inactive']) or btn_s_tag.has_attr('disabled')
-                    href_bs = btn_s_tag.get('href')
-
-                    if not is_prev_bs and not is_disabled_bs and href_bs and href_bs != '#' and not href_bs.startswith("javascript:"):
-                        href_bs_for_retry = href_bs
-                        sel_css_for_retry = sel_css
-                        try:
-                            selenium_potential_cat_next_btns = category_driver.find_elements(By.CSS_SELECTOR, sel_css)
-                            for sel_btn_elem in selenium_potential_cat_next_btns:
-                                if not sel_btn_elem.is_displayed() or not sel_btn_elem.is_enabled(): continue
-                                try:
-                                    sel_btn_elem.find_element(By.XPATH, f"./ancestor::div[contains(@class, '{QUESTION_BLOCK_SELECTOR_BS.split('.')[-1]}')]")
-                                    continue
-                                except NoSuchElementException:
-                                    sel_href = sel_btn_elem.get_attribute('href')
-                                    if sel_href and urljoin(current_category_page_url, href_bs) == urljoin(current_category_page_url, sel_href):
-                                        next_category_page_button_sel_elem = sel_btn_elem; break
-                                    elif not next_category_page_button_sel_elem:
-                                        next_category_page_button_sel_elem = sel_btn_elem
-                            if next_category_page_button_sel_elem and next_category_page_button_sel_elem.get_attribute('href') and \
-                               urljoin(current_category_page_url, href_bs) == urljoin(current_category_page_url, next_category_page_button_sel_elem.get_attribute('href')):
-                                break
-                        except (NoSuchElementException, StaleElementReferenceException): continue
-                if next_category_page_button_sel_elem and next_category_page_button_sel_elem.get_attribute('href') and \
-                   href_bs_for_retry and \
-                   urljoin(current_category_page_url, href_bs_for_retry) == urljoin(current_category_page_url, next_category_page_button_sel_elem.get_attribute('href')):
-                    break
-            
-            if not next_category_page_button_sel_elem:
-                print(f"  [{thread_name}] No 'Next Category Page' button found after Cat Page {category_page_count}. Ending category scan.")
+                    aria_label = (btn_s_tag.get("aria-label") or "").lower()
+                    rel_str = (btn_s_tag.get("rel") or "").lower()
+                    btn_text = element_text(btn_s_tag).lower()
+                    combined = f"{aria_label} {rel_str} {btn_text}"; is_prev = "prev" in combined or "previous" in combined
+                    class_list = (btn_s_tag.get('class') or '').split(); is_disabled = any(c in class_list for c in ['disabled', 'inactive']) or btn_s_tag.get('disabled') is not None
+                    href = btn_s_tag.get('href')
+
+                    if not is_prev and not is_disabled and href and href != '#' and not href.startswith("javascript:"):
+                        next_category_page_href = urljoin(current_category_page_url, href)
+                        break
+                if next_category_page_href: break
+
+            if not next_category_page_href:
+                print(f"  [{thread_name}] No 'Next Category Page' link found after Cat Page {category_page_count}. Ending category scan.")
                 break # This is the primary exit for the category loop
 
-            clicked_successfully = try_click(category_driver, next_category_page_button_sel_elem)
-            if not clicked_successfully:
-                print(f"    [{thread_name}] Initial click failed for Next Cat Page. Trying popups then retry.")
-                attempt_to_close_popups(category_driver, thread_name)
-                time.sleep(0.5)
-                try:
-                    final_attempt_button = None
-                    if href_bs_for_retry:
-                        expected_full_href = urljoin(current_category_page_url, href_bs_for_retry)
-                        all_links_after_popup = WebDriverWait(category_driver, 5).until(
-                            EC.presence_of_all_elements_located((By.XPATH, f"//a[@href='{href_bs_for_retry}' or @href='{expected_full_href}']"))
-                        )
-                        for link in all_links_after_popup:
-                            if link.is_displayed() and link.is_enabled():
-                                try: link.find_element(By.XPATH, f"./ancestor::div[contains(@class, '{QUESTION_BLOCK_SELECTOR_BS.split('.')[-1]}')]"); continue
-                                except NoSuchElementException: final_attempt_button = link; break
-                    
-                    if final_attempt_button:
-                        clicked_successfully = try_click(category_driver, final_attempt_button)
-                    elif sel_css_for_retry:
-                        buttons_after_popup = category_driver.find_elements(By.CSS_SELECTOR, sel_css_for_retry)
-                        for btn_retry in buttons_after_popup:
-                             if btn_retry.is_displayed() and btn_retry.is_enabled():
-                                 try: btn_retry.find_element(By.XPATH, f"./ancestor::div[contains(@class, '{QUESTION_BLOCK_SELECTOR_BS.split('.')[-1]}')]"); continue
-                                 except NoSuchElementException: final_attempt_button = btn_retry; break
-                        if final_attempt_button:
-                             clicked_successfully = try_click(category_driver, final_attempt_button)
-                except TimeoutException: print(f"    [{thread_name}] Timeout re-finding Next Cat Page button after popup attempt.")
-                except Exception as e_refind: print(f"    [{thread_name}] Error during re-find of Next Cat page button: {e_refind}")
-
-            if clicked_successfully:
-                time.sleep(AFTER_CATEGORY_CLICK_SLEEP_S)
-                attempt_to_close_popups(category_driver, thread_name)
-            else:
-                print(f"  [{thread_name}] Failed to click 'Next Category Page' even after popup attempt and retry. Stopping category scan.")
-                break # Exit if click fails repeatedly
+            cat_fetch_headers = base_curl_headers.copy()
+            cat_fetch_headers['Referer'] = current_category_page_url
+            loaded_category_page = await _fetch_category_page_with_curl(curl_session, next_category_page_href, cat_fetch_headers, thread_name)
+            if loaded_category_page is None:
+                print(f"    [{thread_name}] Curl fetch of Next Cat Page was refused; loading it in the browser and re-syncing cookies.")
+                loaded_category_page = await _load_category_page_in_browser_async(
+                    shared_driver, shared_driver_lock, browser_cookies, next_category_page_href, thread_name, refresh_cookies=True
+                )
     except Exception as e_cat_main:
         print(f"  [{thread_name}] MAJOR ERROR in category '{category_name_arg}': {e_cat_main}"); traceback.print_exc()
-    finally:
-        if category_driver: category_driver.quit()
 
     category_scrape_duration = time.perf_counter() - category_scrape_start_time
     num_questions_found = len(collected_questions_for_this_category)
@@ -507,7 +625,7 @@ def _scrape_category_deep_reviews_hybrid(
     return category_name_arg, collected_questions_for_this_category
 
 # --- Main Orchestrator ---
-def scrape_comparably_sync(
+async def scrape_comparably_async(
     company_base_url_str: str, company_slug: str,
     start_date_filter: Optional[datetime] = None, end_date_filter: Optional[datetime] = None
 ) -> Dict[str, Any]:
@@ -520,29 +638,41 @@ def scrape_comparably_sync(
         "comparably_url": company_base_url_str,
         "status_note": "Company name derived from slug."
     }
-    max_concurrent_categories = min(len(REVIEW_CATEGORIES), 4)
-    print(f"  [{company_slug}] Starting HYBRID parallel scrape for {len(REVIEW_CATEGORIES)} categories (max {max_concurrent_categories} concurrent)...")
+    print(f"  [{company_slug}] Starting HYBRID concurrent scrape for {len(REVIEW_CATEGORIES)} categories...")
     category_processing_start_time = time.perf_counter()
-    futures_map = {}
-    with ThreadPoolExecutor(max_workers=max_concurrent_categories, thread_name_prefix="HybridUnlimitedPool") as executor:
-        for cat_name_from_list in REVIEW_CATEGORIES:
-            future = executor.submit(
-                _scrape_category_deep_reviews_hybrid,
-                company_base_url_str, cat_name_from_list, company_slug,
-                start_date_filter, end_date_filter
-            )
-            futures_map[future] = cat_name_from_list
-        for future in as_completed(futures_map):
-            original_category_name_processed = futures_map[future]
-            try:
-                processed_cat_name, questions_from_category = future.result()
-                if questions_from_category:
-                    all_questions_for_company.extend(questions_from_category)
-            except Exception as e_future_exc:
-                print(f"  [{company_slug}] HYBRID Cat task for '{original_category_name_processed}' FAILED: {e_future_exc}")
-                traceback.print_exc()
+    loop = asyncio.get_running_loop()
+    # At most DRIVER_POOL_SIZE companies hold a browser at once; the rest wait here instead of launching extra Chromes
+    async with _driver_lease_semaphore:
+        # One pooled browser per company instead of one per category; each category borrows it for its first page only
+        shared_driver = await loop.run_in_executor(None, acquire_driver)
+        shared_driver_lock = asyncio.Lock()
+        browser_cookies: Dict[str, str] = {}
+        try:
+            user_agent_hdr = await loop.run_in_executor(None, shared_driver.execute_script, "return navigator.userAgent;")
+            # One session (and connection pool) for every curl fetch of the company, sized so categories don't starve each other
+            async with CurlCffiAsyncSession(
+                impersonate=CURL_IMPERSONATE_BROWSER, trust_env=False, max_clients=CURL_MAX_CLIENTS_PER_CATEGORY * len(REVIEW_CATEGORIES)
+            ) as curl_session:
+                category_results = await asyncio.gather(*(
+                    _scrape_category_deep_reviews_hybrid(
+                        company_base_url_str, cat_name_from_list, company_slug,
+                        shared_driver, shared_driver_lock, browser_cookies, curl_session, user_agent_hdr,
+                        start_date_filter, end_date_filter
+                    )
+                    for cat_name_from_list in REVIEW_CATEGORIES
+                ), return_exceptions=True)
+        finally:
+            await loop.run_in_executor(None, release_driver, shared_driver)
+    for original_category_name_processed, category_result in zip(REVIEW_CATEGORIES, category_results):
+        if isinstance(category_result, Exception):
+            print(f"  [{company_slug}] HYBRID Cat task for '{original_category_name_processed}' FAILED: {category_result}")
+            traceback.print_exception(type(category_result), category_result, category_result.__traceback__)
+            continue
+        processed_cat_name, questions_from_category = category_result
+        if questions_from_category:
+            all_questions_for_company.extend(questions_from_category)
     category_processing_duration = time.perf_counter() - category_processing_start_time
-    print(f"  [{company_slug}] All category threads (Hybrid Unlimited) completed in {category_processing_duration:.2f}s.")
+    print(f"  [{company_slug}] All category tasks (Hybrid Unlimited) completed in {category_processing_duration:.2f}s.")
     total_duration = time.perf_counter() - orchestration_start_time
     num_total_questions = len(all_questions_for_company)
     num_total_reviews = sum(len(q.review_section.reviews) for q in all_questions_for_company)
@@ -587,7 +717,7 @@ async def scrape_companies(request: ScrapeRequest = Body(...)) -> Dict[str, Dict
     tasks = []
     if valid_scrape_params:
         for params in valid_scrape_params:
-            tasks.append(asyncio.to_thread(scrape_comparably_sync, params['base_url'], params['slug'], start_date_filter, end_date_filter))
+            tasks.append(scrape_comparably_async(params['base_url'], params['slug'], start_date_filter, end_date_filter))
 
     scraped_results_or_exceptions = await asyncio.gather(*tasks, return_exceptions=True) if tasks else []
 